@@ -0,0 +1,336 @@
+"""Micro-benchmarks for the game engine and the HTTP serialization paths.
+
+    python benchmark.py                          # run all benchmarks
+    python benchmark.py -k make_move             # only benchmarks whose name contains "make_move"
+    python benchmark.py --output baseline.json   # save results
+    python benchmark.py --compare baseline.json  # compare against a saved baseline
+    python benchmark.py --record                 # regenerate benchmarks/positions.json
+"""
+import argparse
+import copy
+import gc
+import json
+import os
+import platform
+import queue
+import random
+import statistics
+import sys
+import time
+
+from http_server import CheckersGame, GameState, HttpServer
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+POSITIONS_FILE = os.path.join(BENCH_DIR, 'positions.json')
+REQUESTS_FILE = os.path.join(BENCH_DIR, 'requests.json')
+
+PLAYER_IDS = {1: "bench-player-1", 2: "bench-player-2"}
+
+
+def new_game(position=None, game_id="1"):
+    game = CheckersGame(game_id)
+    game.add_player(PLAYER_IDS[1])
+    game.add_player(PLAYER_IDS[2])
+    if position:
+        game.board = copy.deepcopy(position["board"])
+        game.current_player = position["current_player"]
+    return game
+
+
+def all_moves(game):
+    """All legal (from, to) moves for the side to move, honouring mandatory jumps"""
+    moves, jumps = [], []
+    for r in range(8):
+        for c in range(8):
+            piece = game.board[r][c]
+            if piece and piece["player"] == game.current_player:
+                for to_row, to_col, is_jump in game.get_valid_moves(r, c):
+                    (jumps if is_jump else moves).append(((r, c), (to_row, to_col)))
+    return jumps or moves
+
+
+def record_positions(count=40, seed=1234):
+    """Play seeded random games and snapshot positions along the way"""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = new_game()
+        ply = 0
+        while game.state == GameState.PLAYING and ply < 150 and len(positions) < count:
+            moves = all_moves(game)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            if ply % 6 == 0:
+                positions.append({
+                    "board": copy.deepcopy(game.board),
+                    "current_player": game.current_player,
+                    "move": [list(move[0]), list(move[1])]
+                })
+            game.make_move(PLAYER_IDS[game.current_player], move[0], move[1])
+            ply += 1
+
+    os.makedirs(BENCH_DIR, exist_ok=True)
+    with open(POSITIONS_FILE, 'w') as f:
+        json.dump(positions, f)
+    print(f"Recorded {len(positions)} positions to {POSITIONS_FILE}")
+
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# --- Timing --------------------------------------------------------------------
+
+def measure(func, setup=None, repeat=7, min_time=0.2):
+    """Time `func` and return per-call statistics in microseconds.
+
+    The loop count is calibrated so each repeat runs for at least `min_time`
+    seconds, GC is disabled while timing, and one warmup run is discarded.
+    With `setup`, it is called before every call and excluded from the timing.
+    """
+    def run(number):
+        if setup is None:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            return time.perf_counter() - start
+        total = 0.0
+        for _ in range(number):
+            arg = setup()
+            start = time.perf_counter()
+            func(arg)
+            total += time.perf_counter() - start
+        return total
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = 1
+        while True:
+            elapsed = run(number)
+            if elapsed >= min_time / 10:
+                break
+            number *= 2
+        number = max(1, int(number * min_time / elapsed))
+
+        run(number)  # warmup
+        samples = [run(number) / number * 1e6 for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "loops": number,
+        "repeat": repeat,
+        "min_us": min(samples),
+        "median_us": statistics.median(samples),
+        "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0
+    }
+
+
+# --- Benchmarks ----------------------------------------------------------------
+
+def bench_get_valid_moves(positions):
+    games = [new_game(p) for p in positions]
+    squares = [[(r, c) for r in range(8) for c in range(8) if g.board[r][c]] for g in games]
+
+    def func():
+        for game, occupied in zip(games, squares):
+            for r, c in occupied:
+                game.get_valid_moves(r, c)
+    return func, None, len(positions)
+
+
+def bench_make_move(positions):
+    game = new_game()
+    items = [(p, tuple(p["move"][0]), tuple(p["move"][1])) for p in positions]
+    index = [0]
+
+    def setup():
+        position, from_pos, to_pos = items[index[0] % len(items)]
+        index[0] += 1
+        game.board = [[dict(piece) if piece else None for piece in row] for row in position["board"]]
+        game.current_player = position["current_player"]
+        game.state = GameState.PLAYING
+        game.lives = {"player1": 12, "player2": 12}
+        return PLAYER_IDS[position["current_player"]], from_pos, to_pos
+
+    def func(arg):
+        game.make_move(*arg)
+    return func, setup, 1
+
+
+def bench_get_state(positions):
+    games = [new_game(p) for p in positions]
+
+    def func():
+        for game in games:
+            game.get_state(PLAYER_IDS[1])
+    return func, None, len(games)
+
+
+def bench_get_state_json(positions):
+    games = [new_game(p) for p in positions]
+
+    def func():
+        for game in games:
+            json.dumps(game.get_state(PLAYER_IDS[1]))
+    return func, None, len(games)
+
+
+def build_request(entry):
+    path = entry["path"].format(game_id="1", player_id=PLAYER_IDS[1])
+    body = entry.get("body")
+    if body is None:
+        return f"{entry['method']} {path} HTTP/1.0\r\n\r\n"
+    body = json.dumps(body).replace("{player_id}", PLAYER_IDS[1])
+    return f"{entry['method']} {path} HTTP/1.0\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n{body}"
+
+
+def make_proses_bench(entry, positions):
+    def bench(_positions):
+        httpserver = HttpServer()
+        game = new_game(positions[0])
+        httpserver.games["1"] = game
+        httpserver.client_games[PLAYER_IDS[1]] = "1"
+        request = build_request(entry)
+        start_board = copy.deepcopy(game.board)
+
+        if not entry.get("mutates"):
+            return (lambda: httpserver.proses(request)), None, 1
+
+        def setup():
+            game.board = [[dict(piece) if piece else None for piece in row] for row in start_board]
+            game.current_player = 1
+            game.state = GameState.PLAYING
+            # Server-wide state too, so /join_game always takes the same waiting or pairing path
+            httpserver.games = {"1": game}
+            httpserver.client_games = {PLAYER_IDS[1]: "1"}
+            httpserver.sessions = {}
+            httpserver.waiting_players = queue.Queue()
+            for i in range(entry.get("waiting_players", 0)):
+                httpserver.waiting_players.put(f"bench-waiting-{i}")
+            return request
+        return httpserver.proses, setup, 1
+    return bench
+
+
+def bench_parse_query_params(_positions):
+    httpserver = HttpServer()
+    paths = [
+        "/game_state?game_id=1&player_id=" + PLAYER_IDS[1],
+        "/check_status?player_id=" + PLAYER_IDS[2],
+        "/game_state?game_id=123456&player_id=0b1e6f63-8b6d-4a5e-9a7c-0f1f2d3e4c5b",
+        "/"
+    ]
+
+    def func():
+        for path in paths:
+            httpserver.parse_query_params(path)
+    return func, None, len(paths)
+
+
+def bench_response_small(_positions):
+    httpserver = HttpServer()
+    return (lambda: httpserver.response(400, 'Bad Request', 'Invalid move', {})), None, 1
+
+
+def bench_response_json(positions):
+    httpserver = HttpServer()
+    body = json.dumps(new_game(positions[0]).get_state(PLAYER_IDS[1]))
+    headers = {'Content-Type': 'application/json'}
+    return (lambda: httpserver.response(200, 'OK', body, headers)), None, 1
+
+
+def collect_benchmarks():
+    benchmarks = {
+        "engine.get_valid_moves": bench_get_valid_moves,
+        "engine.make_move": bench_make_move,
+        "engine.get_state": bench_get_state,
+        "engine.get_state+json": bench_get_state_json,
+        "http.parse_query_params": bench_parse_query_params,
+        "http.response.small": bench_response_small,
+        "http.response.json": bench_response_json,
+    }
+    positions = load_json(POSITIONS_FILE)
+    for entry in load_json(REQUESTS_FILE):
+        benchmarks[f"http.proses.{entry['name']}"] = make_proses_bench(entry, positions)
+    return benchmarks, positions
+
+
+# --- Reporting -----------------------------------------------------------------
+
+def compare(results, baseline, threshold):
+    """Print the relative change per benchmark, return the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if not base:
+            print(f"{name:40} {'-':>12} {result['min_us']:>10.3f}us {'new':>9}")
+            continue
+        change = (result["min_us"] - base["min_us"]) / base["min_us"] * 100
+        flag = ""
+        if change > threshold:
+            flag = "  SLOWER"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:40} {base['min_us']:>10.3f}us {result['min_us']:>10.3f}us {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkers micro-benchmarks")
+    parser.add_argument('-k', dest='filter', default=None, help="only run benchmarks whose name contains this string")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.2, help="minimum seconds per repeat")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=5.0, help="regression threshold in percent")
+    parser.add_argument('--record', action='store_true', help="regenerate the recorded positions and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        record_positions()
+        return 0
+
+    benchmarks, positions = collect_benchmarks()
+    results = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "benchmarks": {}
+    }
+
+    for name, factory in benchmarks.items():
+        if args.filter and args.filter not in name:
+            continue
+        func, setup, ops = factory(positions)
+        stats = measure(func, setup, args.repeat, args.min_time)
+        # Normalise to a single operation when one call runs over a whole corpus
+        for key in ("min_us", "median_us", "stdev_us"):
+            stats[key] /= ops
+        stats["ops_per_call"] = ops
+        results["benchmarks"][name] = stats
+        print(f"{name:40} min {stats['min_us']:>10.3f}us  median {stats['median_us']:>10.3f}us  "
+              f"stdev {stats['stdev_us']:>8.3f}us")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, load_json(args.compare), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
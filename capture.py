@@ -0,0 +1,89 @@
+import gzip
+import json
+import queue
+import threading
+import time
+import zlib
+
+
+def decode_body(head, body):
+    """Undo gzip/deflate Content-Encoding so captures stay readable"""
+    for line in head.split(b'\r\n')[1:]:
+        key, _, value = line.partition(b':')
+        if key.strip().lower() == b'content-encoding':
+            encoding = value.strip().lower()
+            if encoding == b'gzip':
+                return gzip.decompress(body)
+            if encoding == b'deflate':
+                return zlib.decompress(body)
+    return body
+
+
+class TrafficCapture:
+    """Streams raw requests and their responses to a JSONL file.
+
+    record() only enqueues; a single writer thread batches the lines and writes
+    them with a buffered file, so request threads never block on disk I/O.
+    When the queue is full the record is dropped and counted instead.
+    """
+
+    def __init__(self, path, max_queue=10000, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.captured = 0
+        self.dropped = 0
+        self._file = open(path, 'a', buffering=64 * 1024, encoding='utf-8')
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def record(self, address, raw, response=b'', duration_ms=None, ts=None):
+        """ts is when the full request arrived; replay.py orders and paces by it"""
+        try:
+            self.queue.put_nowait((ts or time.time(), address, raw, response, duration_ms))
+        except queue.Full:
+            self.dropped += 1
+
+    def _to_line(self, item):
+        ts, address, raw, response, duration_ms = item
+        head, _, body = response.partition(b'\r\n\r\n')
+        status_line = head.split(b'\r\n', 1)[0].decode('latin-1')
+        parts = status_line.split(' ', 2)
+        status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+        body = decode_body(head, body)
+        entry = {
+            "ts": ts,
+            "client": address[0] if address else None,
+            "request": raw,
+            "status": status,
+            "response_body": body.decode('utf-8', 'replace'),
+            "duration_ms": duration_ms
+        }
+        return json.dumps(entry) + "\n"
+
+    def _write_loop(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < 512:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)
+                    break
+                batch.append(item)
+            self._file.write("".join(self._to_line(i) for i in batch))
+            self._file.flush()
+            self.captured += len(batch)
+        self._file.close()
+
+    def close(self):
+        self.queue.put(None)
+        self._writer.join()
@@ -0,0 +1,516 @@
+"""Display-free Checkers client: protocol, game state and move rules without pygame.
+
+GameClient is the blocking client used by the pygame UI in client.py;
+AsyncGameClient offers the same calls as coroutines for bots and load tests.
+
+    client = GameClient('localhost', 8080)
+    client.join_game()
+    client.wait_for_game()
+    client.make_move((2, 1), (3, 0))
+"""
+import asyncio
+import gzip
+import http.client
+import json
+import os
+import threading
+import time
+import zlib
+from enum import Enum
+
+
+class GameState(Enum):
+    WAITING = "waiting"
+    PLAYING = "playing"
+    GAME_OVER = "game_over"
+
+
+class PieceType(Enum):
+    REGULAR = "regular"
+    KING = "king"
+
+
+def decode_content(data, encoding):
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'deflate':
+        return zlib.decompress(data)
+    return data
+
+
+class GameSession:
+    """Local mirror of one player's game, shared by the sync and async clients"""
+
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, host='localhost', port=8080):
+        self.host = host
+        self.port = port
+        self.player_id = None
+        self.game_id = None
+        self.token = None  # Session token for /resume
+        self.is_my_turn = False
+        self.my_player_number = None
+
+        self.game_state = GameState.WAITING
+        self.board = [[None for _ in range(8)] for _ in range(8)]
+        self.current_player = 1
+        self.score = {"player1": 0, "player2": 0}
+        self.lives = {"player1": 12, "player2": 12}
+        self.game_time = 0
+        self.clocks = None  # Remaining seconds per player when the game is timed
+        self.end_reason = None
+        self.winner = None
+        self.version = None
+        self.status_message = "Connecting to server..."
+        self.restart_requested = False  # Track if restart was requested
+        self.state_etag = None  # ETag of the last /game_state we applied
+
+        self.initialize_board()
+
+    def initialize_board(self):
+        """Initialize the checkers board with pieces"""
+        for row in range(8):
+            for col in range(8):
+                if (row + col) % 2 == 1:  # Dark squares only
+                    if row < 3:
+                        self.board[row][col] = {"player": 1, "type": PieceType.REGULAR.value}
+                    elif row > 4:
+                        self.board[row][col] = {"player": 2, "type": PieceType.REGULAR.value}
+
+    def state_path(self):
+        return f"/game_state?game_id={self.game_id}&player_id={self.player_id}"
+
+    def game_payload(self):
+        return {"game_id": self.game_id, "player_id": self.player_id}
+
+    def move_payload(self, from_pos, to_pos):
+        return {"game_id": self.game_id, "player_id": self.player_id, "from": from_pos, "to": to_pos}
+
+    def handle_join(self, response):
+        if not response:
+            return False
+        self.player_id = response.get('player_id')
+        self.game_id = response.get('game_id')
+        self.token = response.get('token')
+        print(f"Joined game. Player ID: {self.player_id}, Game ID: {self.game_id}")
+        return True
+
+    def handle_resume(self, token, response):
+        if not response:
+            return False
+        self.token = token
+        self.player_id = response.get('player_id')
+        self.game_id = response.get('game_id')
+        if response.get('state'):
+            self.update_local_state(response['state'])
+        print(f"Resumed session. Player ID: {self.player_id}, Game ID: {self.game_id}")
+        return True
+
+    def save_session(self, path):
+        """Persist the session token so a restarted process can resume"""
+        if not self.token:
+            return
+        with open(path, 'w') as f:
+            json.dump({"host": self.host, "port": self.port, "token": self.token}, f)
+
+    def load_session(self, path):
+        """Token saved for this server by save_session, or None"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("host") == self.host and saved.get("port") == self.port:
+            return saved.get("token")
+        return None
+
+    def handle_status(self, response):
+        if response and response.get('status') == 'game_started':
+            self.game_id = response.get('game_id')
+            print(f"Game found! Game ID: {self.game_id}")
+            return True
+        return False
+
+    def handle_restart(self, response):
+        if response:
+            if response.get('status') == 'restart_requested':
+                self.status_message = "Waiting for opponent to agree..."
+                print("Restart requested. Waiting for opponent...")
+            elif response.get('status') == 'game_restarted':
+                self.status_message = "Game restarted!"
+                # The background updater will handle the state update
+                print("Both players agreed! Game restarted.")
+            else:
+                self.status_message = "Restart failed"
+                self.restart_requested = False
+        else:
+            print("Failed to request restart.")
+            self.status_message = "Restart request failed."
+            self.restart_requested = False
+
+    def update_local_state(self, state):
+        """Update the client's game state from server data."""
+        self.board = state.get("board", self.board)
+        self.current_player = state.get("current_player", self.current_player)
+        self.score = state.get("score", self.score)
+        self.lives = state.get("lives", self.lives)
+        self.game_time = state.get("game_time", self.game_time)
+        self.game_state = GameState(state.get("game_state", "waiting"))
+        self.winner = state.get("winner")
+        self.is_my_turn = state.get("your_turn", False)
+        self.my_player_number = state.get("my_player_number")
+        self.clocks = state.get("clocks")
+        self.end_reason = state.get("end_reason")
+        self.version = state.get("version")
+
+        # Reset restart_requested if game started again
+        if self.game_state == GameState.PLAYING and self.restart_requested:
+            self.restart_requested = False
+            print("Game restarted successfully!")
+
+    def get_valid_moves(self, row, col):
+        if not self.board[row][col]:
+            return []
+
+        piece = self.board[row][col]
+        valid_moves = []
+        mandatory_jumps = []
+
+        if piece["type"] == "king":
+            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        else:
+            directions = [(1, -1), (1, 1)] if piece["player"] == 1 else [(-1, -1), (-1, 1)]
+
+        for dr, dc in directions:
+            new_row, new_col = row + dr, col + dc
+            if 0 <= new_row < 8 and 0 <= new_col < 8:
+                if (self.board[new_row][new_col] and
+                    self.board[new_row][new_col]["player"] != piece["player"]):
+                    jump_row, jump_col = new_row + dr, new_col + dc
+                    if 0 <= jump_row < 8 and 0 <= jump_col < 8 and not self.board[jump_row][jump_col]:
+                        mandatory_jumps.append((jump_row, jump_col))
+
+        if mandatory_jumps:
+            return mandatory_jumps
+
+        for dr, dc in directions:
+            new_row, new_col = row + dr, col + dc
+            if 0 <= new_row < 8 and 0 <= new_col < 8 and not self.board[new_row][new_col]:
+                valid_moves.append((new_row, new_col))
+
+        return valid_moves
+
+    def get_pieces_with_mandatory_moves(self):
+        """Get pieces that have mandatory jump moves - only for current player's turn"""
+        mandatory_pieces = []
+
+        # Only show mandatory moves if it's my turn and game is playing
+        if not (self.game_state == GameState.PLAYING and self.is_my_turn):
+            return mandatory_pieces
+
+        for row in range(8):
+            for col in range(8):
+                if (self.board[row][col] and
+                    self.board[row][col]["player"] == self.my_player_number):
+                    moves = self.get_valid_moves(row, col)
+                    if any(abs(move[0] - row) > 1 for move in moves):
+                        mandatory_pieces.append((row, col))
+        return mandatory_pieces
+
+    def get_movable_pieces(self):
+        """Get pieces that can move - only for current player's turn"""
+        movable_pieces = []
+
+        # Only show movable pieces if it's my turn and game is playing
+        if not (self.game_state == GameState.PLAYING and self.is_my_turn):
+            return movable_pieces
+
+        for row in range(8):
+            for col in range(8):
+                if (self.board[row][col] and
+                    self.board[row][col]["player"] == self.my_player_number):
+                    if self.get_valid_moves(row, col):
+                        movable_pieces.append((row, col))
+        return movable_pieces
+
+    def legal_moves(self):
+        """All (from, to) moves the server will accept for us right now"""
+        pieces = self.get_pieces_with_mandatory_moves() or self.get_movable_pieces()
+        return [((row, col), to) for row, col in pieces for to in self.get_valid_moves(row, col)]
+
+
+class GameClient(GameSession):
+    """Blocking client. Each thread keeps its own HTTPConnection and reuses it
+    for as long as the server keeps the connection open."""
+
+    def __init__(self, host='localhost', port=8080, timeout=10):
+        super().__init__(host, port)
+        self.timeout = timeout
+        # Connection and last response ETag are per thread, the UI and poll threads share this client
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self.local.conn = conn
+        return conn
+
+    def http_request(self, method, path, payload=None, etag=None):
+        """Helper function to make HTTP requests."""
+        headers = {'Content-type': 'application/json', 'Accept-Encoding': 'gzip, deflate'}
+        if etag:
+            headers['If-None-Match'] = etag
+        body = json.dumps(payload) if payload else None
+
+        for attempt in range(2):
+            conn = self.connection()
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                # A reused connection may have been closed by the server; only GETs are safe to resend
+                conn.close()
+                if attempt or method != 'GET':
+                    print(f"HTTP request failed: {e}")
+                    self.status_message = "Server connection failed."
+                    return None
+            except Exception as e:
+                conn.close()
+                print(f"HTTP request failed: {e}")
+                self.status_message = "Server connection failed."
+                return None
+
+        self.local.etag = response.getheader('ETag')
+        if response.status == 304:
+            # Nothing changed since the last poll
+            return None
+        data = decode_content(data, response.getheader('Content-Encoding'))
+        if response.status >= 200 and response.status < 300:
+            return json.loads(data.decode())
+        print(f"Error: {response.status} {response.reason} - {data.decode(errors='replace')}")
+        return None
+
+    def join_game(self):
+        """Send a request to join a game."""
+        self.status_message = "Finding a match..."
+        return self.handle_join(self.http_request('POST', '/join_game'))
+
+    def resume(self, token):
+        """Pick up an existing player session instead of joining a new match"""
+        self.status_message = "Resuming session..."
+        return self.handle_resume(token, self.http_request('POST', '/resume', {"token": token}))
+
+    def check_status(self):
+        return self.handle_status(self.http_request('GET', f"/check_status?player_id={self.player_id}"))
+
+    def poll_state(self):
+        """Fetch the game state, returns True when something changed"""
+        state = self.http_request('GET', self.state_path(), etag=self.state_etag)
+        if state:
+            self.state_etag = self.local.etag
+            self.update_local_state(state)
+            return True
+        return False
+
+    def wait_for_game(self, timeout=None):
+        """Block until the server pairs us with an opponent"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while self.game_id is None:
+            if deadline and time.monotonic() > deadline:
+                return False
+            if not self.check_status():
+                time.sleep(self.POLL_INTERVAL)
+        return True
+
+    def background_updater(self, stop_event=None):
+        """Handles background polling for game start and game state."""
+        while not (stop_event and stop_event.is_set()):
+            if not self.player_id:
+                time.sleep(self.POLL_INTERVAL)
+                continue
+
+            # --- Stage 1: Check if the game has started ---
+            if self.game_id is None:
+                self.status_message = "Finding a match..."
+                self.check_status()
+
+            # --- Stage 2: Once in a game, poll for its state ---
+            else:
+                self.poll_state()
+
+            time.sleep(self.POLL_INTERVAL)
+
+    def restart_game(self):
+        """Request restart for the current game (same players)"""
+        if not self.game_id or not self.player_id:
+            print("Cannot restart: no active game")
+            return
+
+        self.status_message = "Requesting restart..."
+        self.restart_requested = True
+        self.handle_restart(self.http_request('POST', '/restart_game', self.game_payload()))
+
+    def make_move(self, from_pos, to_pos):
+        """Send a move to the server, returns True if it was accepted."""
+        if not self.game_id or not self.player_id:
+            return False
+
+        state = self.http_request('POST', '/make_move', self.move_payload(from_pos, to_pos))
+        if state:
+            self.update_local_state(state)
+            return True
+        print("Invalid move refused by server.")
+        return False
+
+
+class AsyncGameClient(GameSession):
+    """asyncio client speaking HTTP/1.1 over a single reusable stream connection"""
+
+    def __init__(self, host='localhost', port=8080, timeout=10):
+        super().__init__(host, port)
+        self.timeout = timeout
+        self.last_etag = None
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _roundtrip(self, method, path, body, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            response_headers[key.strip().lower()] = value.strip()
+
+        if 'content-length' in response_headers:
+            data = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await self.reader.read()
+        if response_headers.get('connection', '').lower() == 'close' or status_line.startswith(b'HTTP/1.0'):
+            await self.close()
+        return status, response_headers, data
+
+    async def http_request(self, method, path, payload=None, etag=None):
+        headers = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip, deflate'}
+        if etag:
+            headers['If-None-Match'] = etag
+        body = json.dumps(payload).encode() if payload else b''
+
+        async with self.lock:
+            for attempt in range(2):
+                try:
+                    status, response_headers, data = await asyncio.wait_for(
+                        self._roundtrip(method, path, body, headers), self.timeout)
+                    break
+                except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError) as e:
+                    await self.close()
+                    if attempt or method != 'GET':
+                        print(f"HTTP request failed: {e}")
+                        self.status_message = "Server connection failed."
+                        return None
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError) as e:
+                    await self.close()
+                    print(f"HTTP request failed: {e}")
+                    self.status_message = "Server connection failed."
+                    return None
+
+        self.last_etag = response_headers.get('etag')
+        if status == 304:
+            return None
+        data = decode_content(data, response_headers.get('content-encoding'))
+        if 200 <= status < 300:
+            return json.loads(data.decode())
+        print(f"Error: {status} - {data.decode(errors='replace')}")
+        return None
+
+    async def join_game(self):
+        self.status_message = "Finding a match..."
+        return self.handle_join(await self.http_request('POST', '/join_game'))
+
+    async def resume(self, token):
+        self.status_message = "Resuming session..."
+        return self.handle_resume(token, await self.http_request('POST', '/resume', {"token": token}))
+
+    async def check_status(self):
+        return self.handle_status(await self.http_request('GET', f"/check_status?player_id={self.player_id}"))
+
+    async def poll_state(self):
+        state = await self.http_request('GET', self.state_path(), etag=self.state_etag)
+        if state:
+            self.state_etag = self.last_etag
+            self.update_local_state(state)
+            return True
+        return False
+
+    async def wait_for_game(self, timeout=None):
+        deadline = time.monotonic() + timeout if timeout else None
+        while self.game_id is None:
+            if deadline and time.monotonic() > deadline:
+                return False
+            if not await self.check_status():
+                await asyncio.sleep(self.POLL_INTERVAL)
+        return True
+
+    async def wait_for_turn(self, timeout=None):
+        """Poll until it is our turn or the game is over"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            await self.poll_state()
+            if self.is_my_turn or self.game_state == GameState.GAME_OVER:
+                return True
+            if deadline and time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    async def restart_game(self):
+        if not self.game_id or not self.player_id:
+            print("Cannot restart: no active game")
+            return
+        self.status_message = "Requesting restart..."
+        self.restart_requested = True
+        self.handle_restart(await self.http_request('POST', '/restart_game', self.game_payload()))
+
+    async def make_move(self, from_pos, to_pos):
+        if not self.game_id or not self.player_id:
+            return False
+        state = await self.http_request('POST', '/make_move', self.move_payload(from_pos, to_pos))
+        if state:
+            self.update_local_state(state)
+            return True
+        print("Invalid move refused by server.")
+        return False
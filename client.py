@@ -1,42 +1,30 @@
-import pygame
-import http.client
-import json
 import threading
 import sys
-import time
-from enum import Enum
+from checkers_client import GameClient, GameState, PieceType
 
-class GameState(Enum):
-    WAITING = "waiting"
-    PLAYING = "playing"
-    GAME_OVER = "game_over"
+pygame = None
 
-class PieceType(Enum):
-    REGULAR = "regular"
-    KING = "king"
 
-class CheckersClient:
-    def __init__(self, host='localhost', port=8080):
-        self.host = host
-        self.port = port
-        self.player_id = None
-        self.game_id = None
-        self.is_my_turn = False
-        self.my_player_number = None
-        
-        self.game_state = GameState.WAITING
-        self.board = [[None for _ in range(8)] for _ in range(8)]
-        self.current_player = 1
+def load_pygame():
+    """Import pygame on first use so the protocol code never needs a display"""
+    global pygame
+    if pygame is None:
+        import pygame as pg
+        pygame = pg
+    return pygame
+
+
+class CheckersClient(GameClient):
+    """Pygame view on top of the display-free GameClient"""
+
+    def __init__(self, host='localhost', port=8080, session_file=None):
+        super().__init__(host, port)
+        self.session_file = session_file
         self.selected_piece = None
-        self.score = {"player1": 0, "player2": 0}
-        self.lives = {"player1": 12, "player2": 12}
-        self.game_time = 0
-        self.winner = None
-        self.status_message = "Connecting to server..."
         self.restart_button = None
-        self.restart_requested = False  # Track if restart was requested
         
         # Pygame setup
+        load_pygame()
         pygame.init()
         self.BOARD_SIZE = 640
         self.CELL_SIZE = self.BOARD_SIZE // 8
@@ -56,182 +44,21 @@ class CheckersClient:
         
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
-        
-        self.initialize_board()
-
-    def initialize_board(self):
-        """Initialize the checkers board with pieces"""
-        for row in range(8):
-            for col in range(8):
-                if (row + col) % 2 == 1:  # Dark squares only
-                    if row < 3:
-                        self.board[row][col] = {"player": 1, "type": PieceType.REGULAR.value}
-                    elif row > 4:
-                        self.board[row][col] = {"player": 2, "type": PieceType.REGULAR.value}
-
-    def http_request(self, method, path, payload=None):
-        """Helper function to make HTTP requests."""
-        try:
-            conn = http.client.HTTPConnection(self.host, self.port)
-            headers = {'Content-type': 'application/json'}
-            body = json.dumps(payload) if payload else None
-            
-            conn.request(method, path, body, headers)
-            response = conn.getresponse()
-            
-            data = response.read()
-            conn.close()
-            
-            if response.status >= 200 and response.status < 300:
-                return json.loads(data.decode())
-            else:
-                print(f"Error: {response.status} {response.reason} - {data.decode()}")
-                return None
-        except Exception as e:
-            print(f"HTTP request failed: {e}")
-            self.status_message = "Server connection failed."
-            return None
-
-    def join_game(self):
-        """Send a request to join a game."""
-        self.status_message = "Finding a match..."
-        response = self.http_request('POST', '/join_game')
-        if response:
-            self.player_id = response.get('player_id')
-            self.game_id = response.get('game_id')
-            print(f"Joined game. Player ID: {self.player_id}, Game ID: {self.game_id}")
-            return True
-        return False
-
-    def background_updater(self):
-        """Handles background polling for game start and game state."""
-        while True:
-            if not self.player_id:
-                time.sleep(0.2)
-                continue
-
-            # --- Stage 1: Check if the game has started ---
-            if self.game_id is None:
-                self.status_message = "Finding a match..."
-                path = f"/check_status?player_id={self.player_id}"
-                response = self.http_request('GET', path)
-                if response and response.get('status') == 'game_started':
-                    self.game_id = response.get('game_id')
-                    print(f"Game found! Game ID: {self.game_id}")
-
-            # --- Stage 2: Once in a game, poll for its state ---
-            else:
-                path = f"/game_state?game_id={self.game_id}&player_id={self.player_id}"
-                state = self.http_request('GET', path)
-                if state:
-                    self.update_local_state(state)
-
-            time.sleep(0.2)
 
     def update_local_state(self, state):
-        """Update the client's game state from server data."""
-        self.board = state.get("board", self.board)
-        self.current_player = state.get("current_player", self.current_player)
-        self.score = state.get("score", self.score)
-        self.lives = state.get("lives", self.lives)
-        self.game_time = state.get("game_time", self.game_time)
-        self.game_state = GameState(state.get("game_state", "waiting"))
-        self.winner = state.get("winner")
-        self.is_my_turn = state.get("your_turn", False)
-        self.my_player_number = state.get("my_player_number")
-        
+        super().update_local_state(state)
         # Clear selected piece if game is over
         if self.game_state == GameState.GAME_OVER:
             self.selected_piece = None
-            
-        # Reset restart_requested if game started again
-        if self.game_state == GameState.PLAYING and self.restart_requested:
-            self.restart_requested = False
-            print("Game restarted successfully!")
 
     def restart_game(self):
-        """Request restart for the current game (same players)"""
-        if not self.game_id or not self.player_id:
-            print("Cannot restart: no active game")
-            return
-            
-        self.status_message = "Requesting restart..."
-        self.restart_requested = True
         self.selected_piece = None
-        
-        payload = {
-            "game_id": self.game_id,
-            "player_id": self.player_id
-        }
-        
-        response = self.http_request('POST', '/restart_game', payload)
-        if response:
-            if response.get('status') == 'restart_requested':
-                self.status_message = "Waiting for opponent to agree..."
-                print("Restart requested. Waiting for opponent...")
-            elif response.get('status') == 'game_restarted':
-                self.status_message = "Game restarted!"
-                # The background updater will handle the state update
-                print("Both players agreed! Game restarted.")
-            else:
-                self.status_message = "Restart failed"
-                self.restart_requested = False
-        else:
-            print("Failed to request restart.")
-            self.status_message = "Restart request failed."
-            self.restart_requested = False
+        super().restart_game()
 
     def make_move(self, from_pos, to_pos):
-        """Send a move to the server."""
-        if not self.game_id or not self.player_id:
-            return
-
-        payload = {
-            "game_id": self.game_id,
-            "player_id": self.player_id,
-            "from": from_pos,
-            "to": to_pos
-        }
-        
-        state = self.http_request('POST', '/make_move', payload)
-        if state:
-            self.update_local_state(state)
-        else:
-            print("Invalid move refused by server.")
+        accepted = super().make_move(from_pos, to_pos)
         self.selected_piece = None
-
-    def get_pieces_with_mandatory_moves(self):
-        """Get pieces that have mandatory jump moves - only for current player's turn"""
-        mandatory_pieces = []
-        
-        # Only show mandatory moves if it's my turn and game is playing
-        if not (self.game_state == GameState.PLAYING and self.is_my_turn):
-            return mandatory_pieces
-            
-        for row in range(8):
-            for col in range(8):
-                if (self.board[row][col] and 
-                    self.board[row][col]["player"] == self.my_player_number):
-                    moves = self.get_valid_moves(row, col)
-                    if any(abs(move[0] - row) > 1 for move in moves):
-                        mandatory_pieces.append((row, col))
-        return mandatory_pieces
-
-    def get_movable_pieces(self):
-        """Get pieces that can move - only for current player's turn"""
-        movable_pieces = []
-        
-        # Only show movable pieces if it's my turn and game is playing
-        if not (self.game_state == GameState.PLAYING and self.is_my_turn):
-            return movable_pieces
-        
-        for row in range(8):
-            for col in range(8):
-                if (self.board[row][col] and 
-                    self.board[row][col]["player"] == self.my_player_number):
-                    if self.get_valid_moves(row, col):
-                        movable_pieces.append((row, col))
-        return movable_pieces
+        return accepted
 
     def draw_board(self):
         mandatory_pieces = self.get_pieces_with_mandatory_moves()
@@ -271,38 +98,6 @@ class CheckersClient:
                 move_x, move_y = move_col * self.CELL_SIZE, move_row * self.CELL_SIZE
                 pygame.draw.circle(self.screen, self.GREEN, (move_x + self.CELL_SIZE // 2, move_y + self.CELL_SIZE // 2), 10)
 
-    def get_valid_moves(self, row, col):
-        if not self.board[row][col]:
-            return []
-        
-        piece = self.board[row][col]
-        valid_moves = []
-        mandatory_jumps = []
-        
-        if piece["type"] == "king":
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        else:
-            directions = [(1, -1), (1, 1)] if piece["player"] == 1 else [(-1, -1), (-1, 1)]
-            
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8:
-                if (self.board[new_row][new_col] and 
-                    self.board[new_row][new_col]["player"] != piece["player"]):
-                    jump_row, jump_col = new_row + dr, new_col + dc
-                    if 0 <= jump_row < 8 and 0 <= jump_col < 8 and not self.board[jump_row][jump_col]:
-                        mandatory_jumps.append((jump_row, jump_col))
-                        
-        if mandatory_jumps:
-            return mandatory_jumps
-            
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 8 and not self.board[new_row][new_col]:
-                valid_moves.append((new_row, new_col))
-                
-        return valid_moves
-
     def handle_click(self, pos):
         # Check if restart button was clicked
         if (self.game_state == GameState.GAME_OVER and 
@@ -405,6 +200,17 @@ class CheckersClient:
         # Game Time
         time_text = f"Time: {self.game_time//60:02d}:{self.game_time%60:02d}"
         self.screen.blit(self.small_font.render(time_text, True, self.BLACK), (info_x, 200))
+
+        # Chess clocks for timed games
+        if self.clocks:
+            for i, key in enumerate(("player1", "player2")):
+                remaining = int(self.clocks.get(key, 0))
+                clock_text = f"P{i + 1} Clock: {remaining//60:02d}:{remaining%60:02d}"
+                clock_color = self.BLUE if i == 0 else self.RED
+                self.screen.blit(self.small_font.render(clock_text, True, clock_color), (info_x, 300 + i * 20))
+        if self.game_state == GameState.GAME_OVER and self.end_reason == "timeout":
+            on_time_text = "Won on time" if self.winner == self.my_player_number else "Lost on time"
+            self.screen.blit(self.small_font.render(on_time_text, True, self.GRAY), (info_x, 345))
         
         # Show restart status if waiting for opponent
         if self.restart_requested and "Waiting for opponent" in self.status_message:
@@ -428,9 +234,12 @@ class CheckersClient:
 
     def run(self):
         """Main game loop"""
-        if not self.join_game():
+        token = self.load_session(self.session_file) if self.session_file else None
+        if not (token and self.resume(token)) and not self.join_game():
             print("Failed to join game. Exiting.")
             return
+        if self.session_file:
+            self.save_session(self.session_file)
             
         # Start polling thread
         poll_thread = threading.Thread(target=self.background_updater)
@@ -458,5 +267,6 @@ class CheckersClient:
 if __name__ == "__main__":
     host = sys.argv[1] if len(sys.argv) > 1 else 'localhost'
     port = int(sys.argv[2]) if len(sys.argv) > 2 else 8080
-    client = CheckersClient(host, port)
+    session_file = sys.argv[3] if len(sys.argv) > 3 else None
+    client = CheckersClient(host, port, session_file)
     client.run()
\ No newline at end of file
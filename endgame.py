@@ -0,0 +1,535 @@
+"""Endgame tablebase and position analysis for CheckersGame positions.
+
+The rules modelled here are the server's rules: men move and capture
+forward only, captures are mandatory, a capture continues with the same
+player while the landing piece can capture again (no promotion until the
+sequence ends), and a player without pieces loses. A player with pieces but
+no legal move is scored as a loss, as in standard checkers.
+
+Positions are always stored from the point of view of the side to move,
+oriented like player 1 (men move towards row 7); player 2 positions are
+rotated 180 degrees first. The database is split into slices by material
+(side-to-move men, kings, opponent men, kings), one file per slice with one
+byte per position:
+
+    0          draw (or unresolved)
+    1..127     side to move wins, in that many plies
+    128..255   side to move loses, in (value - 128) plies
+
+Generate the files offline, then the server memory-maps them on demand:
+
+    python endgame.py --max-pieces 4 --workers 8 --output endgame_db
+"""
+import argparse
+import itertools
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from math import comb
+from multiprocessing import Pool
+
+SQUARES = [(r, c) for r in range(8) for c in range(8) if (r + c) % 2 == 1]
+SQUARE_INDEX = {sq: i for i, sq in enumerate(SQUARES)}
+ROTATED = [SQUARE_INDEX[(7 - r, 7 - c)] for r, c in SQUARES]
+ROW = [r for r, _ in SQUARES]
+
+FORWARD = ((1, -1), (1, 1))
+ALL_DIRECTIONS = ((1, -1), (1, 1), (-1, -1), (-1, 1))
+
+
+def _neighbors():
+    table = []
+    for r, c in SQUARES:
+        entry = {}
+        for dr, dc in ALL_DIRECTIONS:
+            entry[(dr, dc)] = SQUARE_INDEX.get((r + dr, c + dc))
+        table.append(entry)
+    return table
+
+
+NEIGHBOR = _neighbors()
+
+WIN_MAX = 127
+LOSS_BASE = 128
+DEFAULT_DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'endgame_db')
+
+
+# --- Position handling -----------------------------------------------------------
+
+def from_board(board, current_player):
+    """(men, kings, opponent men, opponent kings) from a CheckersGame board, side to move first"""
+    groups = ([], [], [], [])
+    for (r, c), i in SQUARE_INDEX.items():
+        piece = board[r][c]
+        if not piece:
+            continue
+        if current_player == 2:
+            i = ROTATED[i]
+        own = piece["player"] == current_player
+        king = piece["type"] == "king"
+        groups[(0 if own else 2) + (1 if king else 0)].append(i)
+    return tuple(tuple(sorted(g)) for g in groups)
+
+
+def to_board_square(i, current_player):
+    if current_player == 2:
+        i = ROTATED[i]
+    return SQUARES[i]
+
+
+def flip(men, kings, opp_men, opp_kings):
+    """Hand the move to the opponent and re-orient the board for them"""
+    return (
+        tuple(sorted(ROTATED[i] for i in opp_men)),
+        tuple(sorted(ROTATED[i] for i in opp_kings)),
+        tuple(sorted(ROTATED[i] for i in men)),
+        tuple(sorted(ROTATED[i] for i in kings)),
+    )
+
+
+def material(pos):
+    return tuple(len(g) for g in pos)
+
+
+def piece_count(pos):
+    return sum(len(g) for g in pos)
+
+
+def has_jump(square, is_king, own, opponents):
+    for d in (ALL_DIRECTIONS if is_king else FORWARD):
+        over = NEIGHBOR[square][d]
+        if over is not None and over in opponents:
+            land = NEIGHBOR[over][d]
+            if land is not None and land not in own and land not in opponents:
+                return True
+    return False
+
+
+def generate_moves(pos):
+    """Legal (from, to, captured) moves for the side to move, jumps are mandatory"""
+    men, kings, opp_men, opp_kings = pos
+    own = set(men) | set(kings)
+    opponents = set(opp_men) | set(opp_kings)
+    jumps, steps = [], []
+    for square, directions in itertools.chain(((s, FORWARD) for s in men), ((s, ALL_DIRECTIONS) for s in kings)):
+        for d in directions:
+            target = NEIGHBOR[square][d]
+            if target is None or target in own:
+                continue
+            if target in opponents:
+                land = NEIGHBOR[target][d]
+                if land is not None and land not in own and land not in opponents:
+                    jumps.append((square, land, target))
+            elif not jumps:
+                steps.append((square, target, None))
+    return jumps or steps
+
+
+def apply_move(pos, move):
+    """Return (next position, same_side, won).
+
+    same_side is True when a capture sequence continues, in which case the
+    position is still seen from the mover; otherwise it has been flipped.
+    """
+    men, kings, opp_men, opp_kings = (set(g) for g in pos)
+    square, to, captured = move
+    is_king = square in kings
+    (kings if is_king else men).discard(square)
+    (kings if is_king else men).add(to)
+
+    if captured is not None:
+        opp_men.discard(captured)
+        opp_kings.discard(captured)
+        if not opp_men and not opp_kings:
+            return None, False, True
+        if has_jump(to, is_king, men | kings, opp_men | opp_kings):
+            return (tuple(sorted(men)), tuple(sorted(kings)),
+                    tuple(sorted(opp_men)), tuple(sorted(opp_kings))), True, False
+
+    if not is_king and ROW[to] == 7:
+        men.discard(to)
+        kings.add(to)
+    return flip(men, kings, opp_men, opp_kings), False, False
+
+
+# --- Indexing --------------------------------------------------------------------
+
+def rank(squares):
+    """Combinatorial number system rank of a sorted square tuple"""
+    return sum(comb(s, k + 1) for k, s in enumerate(squares))
+
+
+def slice_size(key):
+    size = 1
+    for count in key:
+        size *= comb(32, count)
+    return size
+
+
+def position_index(pos):
+    index = 0
+    for group in pos:
+        index = index * comb(32, len(group)) + rank(group)
+    return index
+
+
+def slice_positions(key):
+    """All legal placements for a material slice"""
+    a, b, c, d = key
+    squares = range(32)
+    for men in itertools.combinations(squares, a):
+        used = set(men)
+        for kings in itertools.combinations([s for s in squares if s not in used], b):
+            used_k = used | set(kings)
+            for opp_men in itertools.combinations([s for s in squares if s not in used_k], c):
+                used_m = used_k | set(opp_men)
+                for opp_kings in itertools.combinations([s for s in squares if s not in used_m], d):
+                    yield (men, kings, opp_men, opp_kings)
+
+
+def slice_name(key):
+    return "slice_{}{}{}{}.bin".format(*key)
+
+
+def decode(value):
+    """('win' | 'loss' | 'draw', plies) from a database byte"""
+    if value == 0:
+        return "draw", None
+    if value < LOSS_BASE:
+        return "win", value
+    return "loss", value - LOSS_BASE
+
+
+class EndgameDB:
+    """Lazily memory-mapped tablebase files, one O(1) byte lookup per probe"""
+
+    def __init__(self, directory=DEFAULT_DB_DIR, max_pieces=None):
+        self.directory = directory
+        self.maps = {}
+        self.lock = threading.Lock()
+        # Read from the manifest unless given, the generator passes it while the manifest is not written yet
+        self._max_pieces = max_pieces
+
+    @property
+    def max_pieces(self):
+        if self._max_pieces is None:
+            try:
+                with open(os.path.join(self.directory, 'manifest.json')) as f:
+                    self._max_pieces = json.load(f)["max_pieces"]
+            except (OSError, ValueError, KeyError):
+                self._max_pieces = 0
+        return self._max_pieces
+
+    def slice_map(self, key):
+        data = self.maps.get(key)
+        if data is None and key not in self.maps:
+            with self.lock:
+                if key not in self.maps:
+                    path = os.path.join(self.directory, slice_name(key))
+                    if os.path.exists(path) and os.path.getsize(path):
+                        with open(path, 'rb') as f:
+                            self.maps[key] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    else:
+                        self.maps[key] = None
+                data = self.maps[key]
+        return data
+
+    def probe(self, pos):
+        """Database byte for the position, None if it is not covered"""
+        if piece_count(pos) > self.max_pieces:
+            return None
+        data = self.slice_map(material(pos))
+        if data is None:
+            return None
+        return data[position_index(pos)]
+
+    def close(self):
+        for data in self.maps.values():
+            if data is not None:
+                data.close()
+        self.maps = {}
+
+
+# --- Generation ------------------------------------------------------------------
+
+def child_value(db, pos, move, group):
+    """Value of a move for the mover as a database byte, or the successor if it lies in the group"""
+    nxt, same_side, won = apply_move(pos, move)
+    if won:
+        return 1, None
+    if not same_side and material(nxt) in group:
+        return None, nxt
+    # Captures and promotions lead into slices solved earlier
+    value = db.probe(nxt)
+    if not value:
+        return 0, None
+    result, plies = decode(value)
+    if not same_side:
+        result = "loss" if result == "win" else "win"
+    plies = min(plies + 1, WIN_MAX)
+    return (plies, None) if result == "win" else (LOSS_BASE + plies, None)
+
+
+def solve_group(args):
+    """Solve slices that reach each other through quiet moves and write their files"""
+    keys, directory = args
+    db = EndgameDB(directory, max_pieces=sum(keys[0]))
+    offsets, total = {}, 0
+    for key in keys:
+        offsets[key] = total
+        total += slice_size(key)
+
+    values = bytearray(total)
+    pending = []            # global indices still unresolved
+    succ_start = array('I')
+    succ_flat = array('I')
+    ext_loss = {}           # index -> longest external loss, only while all externals lose
+    ext_blocked = set()     # an external successor is a draw, the position cannot be lost
+
+    for key in keys:
+        base = offsets[key]
+        for pos in slice_positions(key):
+            index = base + position_index(pos)
+            moves = generate_moves(pos)
+            if not moves:
+                values[index] = LOSS_BASE
+                continue
+            best_win, longest_loss, blocked = None, 0, False
+            start = len(succ_flat)
+            for move in moves:
+                value, nxt = child_value(db, pos, move, offsets)
+                if nxt is not None:
+                    succ_flat.append(offsets[material(nxt)] + position_index(nxt))
+                elif value == 0:
+                    blocked = True
+                elif value < LOSS_BASE:
+                    best_win = value if best_win is None else min(best_win, value)
+                else:
+                    longest_loss = max(longest_loss, value - LOSS_BASE)
+            if best_win is not None:
+                values[index] = best_win
+                continue
+            pending.append(index)
+            succ_start.append(start)
+            succ_start.append(len(succ_flat))
+            if blocked:
+                ext_blocked.add(index)
+            elif longest_loss:
+                ext_loss[index] = longest_loss
+
+    # Iterate to a fixpoint over the quiet moves inside the group
+    order = list(range(len(pending)))
+    while True:
+        updates = []
+        remaining = []
+        for n in order:
+            index = pending[n]
+            best_win = None
+            all_lose = index not in ext_blocked
+            longest_loss = ext_loss.get(index, 0)
+            for s in succ_flat[succ_start[2 * n]:succ_start[2 * n + 1]]:
+                value = values[s]
+                if value == 0:
+                    all_lose = False
+                elif value >= LOSS_BASE:
+                    plies = value - LOSS_BASE + 1
+                    best_win = plies if best_win is None else min(best_win, plies)
+                else:
+                    longest_loss = max(longest_loss, value + 1)
+            if best_win is not None:
+                updates.append((index, min(best_win, WIN_MAX)))
+            elif all_lose:
+                updates.append((index, LOSS_BASE + min(longest_loss, WIN_MAX)))
+            else:
+                remaining.append(n)
+        if not updates:
+            break
+        for index, value in updates:
+            values[index] = value
+        order = remaining
+
+    for key in keys:
+        start = offsets[key]
+        with open(os.path.join(directory, slice_name(key)), 'wb') as f:
+            f.write(values[start:start + slice_size(key)])
+    db.close()
+    return keys, len(pending) - len(order), len(order)
+
+
+def material_groups(max_pieces):
+    """Slice groups in dependency order: fewer pieces first, then fewer men"""
+    keys = set()
+    for total in range(2, max_pieces + 1):
+        for own in range(1, total):
+            opp = total - own
+            for a in range(own + 1):
+                for c in range(opp + 1):
+                    keys.add((a, own - a, c, opp - c))
+    groups = {}
+    for key in keys:
+        mirror = (key[2], key[3], key[0], key[1])
+        groups.setdefault(min(key, mirror), sorted({key, mirror}))
+    levels = {}
+    for group in groups.values():
+        key = group[0]
+        levels.setdefault((sum(key), key[0] + key[2]), []).append(tuple(group))
+    return [levels[level] for level in sorted(levels)]
+
+
+def generate(max_pieces, directory, workers):
+    os.makedirs(directory, exist_ok=True)
+    started = time.time()
+    with Pool(workers) as pool:
+        for level in material_groups(max_pieces):
+            for keys, solved, draws in pool.imap_unordered(solve_group, [(g, directory) for g in level]):
+                print(f"{'+'.join(''.join(map(str, k)) for k in keys)}: {solved} resolved by iteration, "
+                      f"{draws} drawn ({time.time() - started:.1f}s)")
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump({"max_pieces": max_pieces, "generated": time.strftime('%Y-%m-%dT%H:%M:%S')}, f)
+    print(f"Endgame database up to {max_pieces} pieces written to {directory}")
+
+
+# --- Analysis --------------------------------------------------------------------
+
+MAN_VALUE = 100
+KING_VALUE = 150
+MATE_SCORE = 10000
+
+
+def evaluate(pos):
+    men, kings, opp_men, opp_kings = pos
+    return (len(men) - len(opp_men)) * MAN_VALUE + (len(kings) - len(opp_kings)) * KING_VALUE
+
+
+def db_score(value):
+    result, plies = decode(value)
+    if result == "win":
+        return MATE_SCORE - plies
+    if result == "loss":
+        return -MATE_SCORE + plies
+    return 0
+
+
+class Searcher:
+    """Depth- and node-bounded alpha-beta that consults the tablebase at every node"""
+
+    def __init__(self, db, max_nodes=20000):
+        self.db = db
+        self.max_nodes = max_nodes
+        self.nodes = 0
+
+    def search(self, pos, depth, alpha, beta):
+        self.nodes += 1
+        value = self.db.probe(pos) if self.db else None
+        if value is not None:
+            return db_score(value)
+        moves = generate_moves(pos)
+        if not moves:
+            return -MATE_SCORE
+        if depth <= 0 or self.nodes >= self.max_nodes:
+            return evaluate(pos)
+
+        best = -MATE_SCORE - 1
+        for move in moves:
+            nxt, same_side, won = apply_move(pos, move)
+            if won:
+                score = MATE_SCORE - 1
+            elif same_side:
+                score = self.search(nxt, depth, alpha, beta)
+            else:
+                score = -self.search(nxt, depth - 1, -beta, -alpha)
+            if score > best:
+                best = score
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best
+
+
+def best_db_move(db, pos):
+    """Move that keeps the tablebase result, preferring the fastest win / slowest loss"""
+    best, best_key = None, None
+    for move in generate_moves(pos):
+        nxt, same_side, won = apply_move(pos, move)
+        if won:
+            return move
+        value = db.probe(nxt)
+        if value is None:
+            continue
+        result, plies = decode(value)
+        if not same_side:
+            result = {"win": "loss", "loss": "win", "draw": "draw"}[result]
+        # Lower key is better: wins by distance, then draws, then losses by reversed distance
+        key = {"win": (0, plies or 0), "draw": (1, 0), "loss": (2, -(plies or 0))}[result]
+        if best_key is None or key < best_key:
+            best, best_key = move, key
+    return best
+
+
+def analyze(board, current_player, db=None, depth=6, max_nodes=20000):
+    """Evaluate a CheckersGame position for the side to move"""
+    pos = from_board(board, current_player)
+    analysis = {
+        "side_to_move": current_player,
+        "pieces": piece_count(pos),
+        "source": None,
+        "result": None,
+        "distance": None,
+        "score": None,
+        "best_move": None,
+        "nodes": 0
+    }
+    moves = generate_moves(pos)
+    if not moves:
+        analysis.update(source="rules", result="loss", distance=0, score=-MATE_SCORE)
+        return analysis
+
+    value = db.probe(pos) if db else None
+    if value is not None:
+        result, plies = decode(value)
+        move = best_db_move(db, pos)
+        analysis.update(source="tablebase", result=result, distance=plies, score=db_score(value))
+    else:
+        searcher = Searcher(db, max_nodes)
+        best, move = -MATE_SCORE - 1, None
+        for candidate in moves:
+            nxt, same_side, won = apply_move(pos, candidate)
+            if won:
+                score = MATE_SCORE - 1
+            elif same_side:
+                score = searcher.search(nxt, depth - 1, -MATE_SCORE - 1, MATE_SCORE + 1)
+            else:
+                score = -searcher.search(nxt, depth - 1, -MATE_SCORE - 1, MATE_SCORE + 1)
+            if score > best:
+                best, move = score, candidate
+        analysis.update(source="search", score=best, nodes=searcher.nodes, depth=depth)
+        if abs(best) >= MATE_SCORE - 1000:
+            analysis["result"] = "win" if best > 0 else "loss"
+            analysis["distance"] = MATE_SCORE - abs(best)
+
+    if move:
+        analysis["best_move"] = {
+            "from": list(to_board_square(move[0], current_player)),
+            "to": list(to_board_square(move[1], current_player))
+        }
+    return analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the Checkers endgame database")
+    parser.add_argument('--max-pieces', type=int, default=4, help="largest total piece count to solve")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--output', default=DEFAULT_DB_DIR)
+    args = parser.parse_args()
+    if args.max_pieces < 2:
+        parser.error("--max-pieces must be at least 2")
+    generate(args.max_pieces, args.output, args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
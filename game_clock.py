@@ -0,0 +1,64 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+class ClockScheduler:
+    """Single timer thread firing flag-falls for every game clock.
+
+    Deadlines live in one heap, so scheduling and firing cost O(log n) no matter
+    how many games are running. Entries are never removed; a game ignores
+    callbacks whose generation no longer matches its current turn.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.cond = threading.Condition()
+        self.counter = itertools.count()
+        self.thread = None
+        self.running = False
+
+    def schedule(self, deadline, callback, *args):
+        """Run callback(*args) on the scheduler thread once time.monotonic() >= deadline"""
+        with self.cond:
+            entry = (deadline, next(self.counter), callback, args)
+            heapq.heappush(self.heap, entry)
+            if self.thread is None:
+                self.running = True
+                self.thread = threading.Thread(target=self._run, name="clock-scheduler", daemon=True)
+                self.thread.start()
+            if self.heap[0] is entry:
+                # New earliest deadline, wake the timer thread to re-arm
+                self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running:
+                    if not self.heap:
+                        self.cond.wait()
+                        continue
+                    delay = self.heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.cond.wait(delay)
+                if not self.running:
+                    return
+                _, _, callback, args = heapq.heappop(self.heap)
+            try:
+                callback(*args)
+            except Exception as e:
+                logging.error(f"Clock callback failed: {e}")
+
+    def pending(self):
+        return len(self.heap)
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
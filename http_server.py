@@ -5,9 +5,19 @@ from glob import glob
 from datetime import datetime
 import json
 import time
+import math
 import queue
 import copy
+import threading
+import gzip
+import zlib
+import hmac
+import secrets
 from enum import Enum
+from tracing import RequestTracer
+from tournament import Tournament
+from game_clock import ClockScheduler
+from endgame import EndgameDB, analyze
 
 class GameState(Enum):
     WAITING = "waiting"
@@ -31,6 +41,17 @@ class CheckersGame:
         self.game_time = 0
         self.winner = None
         self.restart_requests = set()  # Track which players want to restart
+        self.version = 0  # Bumped on every state change, used for ETags
+        self.tournament_id = None
+        self.end_reason = None
+        self.lock = threading.RLock()
+        # Time control, see set_time_control()
+        self.time_control = None
+        self.clock_scheduler = None
+        self.clocks = None
+        self.turn_started = None
+        self.clock_generation = 0
+        self.on_game_over = None  # Called with the game once it reaches GAME_OVER
 
         self.initialize_board()
 
@@ -47,6 +68,7 @@ class CheckersGame:
         if len(self.players) < 2:
             game_position = len(self.players) + 1
             self.players[player_id] = {"id": player_id, "game_position": game_position}
+            self.version += 1
             if len(self.players) == 2:
                 self.start_game()
             return True
@@ -56,6 +78,8 @@ class CheckersGame:
         self.state = GameState.PLAYING
         self.start_time = time.time()
         self.current_player = 1 
+        self.version += 1
+        self.start_turn_clock()
 
     def restart_game(self):
         """Restart the game with the same players"""
@@ -69,6 +93,11 @@ class CheckersGame:
         self.game_time = 0
         self.winner = None
         self.restart_requests.clear()  # Clear restart requests
+        self.end_reason = None
+        self.version += 1
+        if self.time_control:
+            self.clocks = {1: float(self.time_control["initial"]), 2: float(self.time_control["initial"])}
+            self.start_turn_clock()
         
         # Reinitialize board with pieces
         self.initialize_board()
@@ -79,18 +108,21 @@ class CheckersGame:
         """Handle restart request from a player"""
         if player_id not in self.players:
             return {"status": "error", "message": "Player not in this game"}
-        
-        # Add player to restart requests
-        self.restart_requests.add(player_id)
-        
-        # Check if both players want to restart
-        if len(self.restart_requests) == 2:
-            # Both players agreed, restart the game
-            self.restart_game()
-            return {"status": "game_restarted"}
-        else:
-            # Still waiting for other player
-            return {"status": "restart_requested", "waiting_for": len(self.players) - len(self.restart_requests)}
+
+        # Same lock as make_move and check_flag, so a pending flag-fall never sees half-reset clocks
+        with self.lock:
+            # Add player to restart requests
+            self.restart_requests.add(player_id)
+            self.version += 1
+
+            # Check if both players want to restart
+            if len(self.restart_requests) == 2:
+                # Both players agreed, restart the game
+                self.restart_game()
+                return {"status": "game_restarted"}
+            else:
+                # Still waiting for other player
+                return {"status": "restart_requested", "waiting_for": len(self.players) - len(self.restart_requests)}
 
     def get_state(self, player_id=None):
         self.update_game_time()
@@ -113,7 +145,14 @@ class CheckersGame:
             "my_player_number": my_game_position,
             "your_turn": self.current_player == my_game_position if my_game_position else False,
             "restart_requests": len(self.restart_requests),  # Include restart status
-            "restart_requested_by_me": player_id in self.restart_requests if player_id else False
+            "restart_requested_by_me": player_id in self.restart_requests if player_id else False,
+            "version": self.version,
+            "end_reason": self.end_reason,
+            "time_control": self.time_control,
+            "clocks": {
+                "player1": round(self.remaining_time(1), 1),
+                "player2": round(self.remaining_time(2), 1)
+            } if self.time_control else None
         }
     
     def update_game_time(self):
@@ -160,6 +199,25 @@ class CheckersGame:
 
 
     def make_move(self, player_id, from_pos, to_pos):
+        with self.lock:
+            if self.time_control and self.state == GameState.PLAYING and self.remaining_time(self.current_player) <= 0:
+                # The flag fell before the scheduler got to it
+                self.flag_fall()
+                return False
+
+            mover = self.current_player
+            if not self.apply_move(player_id, from_pos, to_pos):
+                return False
+
+            # The clock keeps running through multi-jumps, it only stops when the turn passes
+            if self.time_control and (self.state != GameState.PLAYING or self.current_player != mover):
+                self.clocks[mover] -= time.monotonic() - self.turn_started
+                if self.state == GameState.PLAYING:
+                    self.clocks[mover] += self.time_control["increment"]
+                    self.start_turn_clock()
+            return True
+
+    def apply_move(self, player_id, from_pos, to_pos):
         player_info = self.players.get(player_id)
         if not player_info or self.state != GameState.PLAYING or player_info['game_position'] != self.current_player:
             return False
@@ -197,6 +255,7 @@ class CheckersGame:
         piece = self.board[from_row][from_col]
         self.board[to_row][to_col] = piece
         self.board[from_row][from_col] = None
+        self.version += 1
 
         if is_jump:
             captured_row = (from_row + to_row) // 2
@@ -229,42 +288,158 @@ class CheckersGame:
         self.broadcast_game_update()
         return True
 
-    def end_game(self, winner):
+    def end_game(self, winner, reason="no_pieces"):
         self.state = GameState.GAME_OVER
         self.winner = winner
+        self.end_reason = reason
+        self.version += 1
+        if self.on_game_over:
+            self.on_game_over(self)
 
     def broadcast_game_update(self):
         pass
 
+    def set_time_control(self, initial, increment, scheduler):
+        """Enable chess-clock style time control: `initial` seconds each plus `increment` per move"""
+        self.time_control = {"initial": initial, "increment": increment}
+        self.clock_scheduler = scheduler
+        self.clocks = {1: float(initial), 2: float(initial)}
+
+    def start_turn_clock(self):
+        if not self.time_control:
+            return
+        self.turn_started = time.monotonic()
+        self.clock_generation += 1
+        deadline = self.turn_started + self.clocks[self.current_player]
+        self.clock_scheduler.schedule(deadline, self.check_flag, self.clock_generation)
+
+    def remaining_time(self, position):
+        remaining = self.clocks[position]
+        if self.state == GameState.PLAYING and position == self.current_player and self.turn_started:
+            remaining -= time.monotonic() - self.turn_started
+        return max(0.0, remaining)
+
+    def check_flag(self, generation):
+        """Scheduler callback, fires at the deadline of the turn it was scheduled for"""
+        with self.lock:
+            if generation != self.clock_generation or self.state != GameState.PLAYING:
+                return
+            if self.remaining_time(self.current_player) > 0:
+                deadline = self.turn_started + self.clocks[self.current_player]
+                self.clock_scheduler.schedule(deadline, self.check_flag, generation)
+                return
+            self.flag_fall()
+
+    def flag_fall(self):
+        loser = self.current_player
+        self.clocks[loser] = 0.0
+        print(f"Game {self.game_id}: player {loser} ran out of time")
+        self.end_game(2 if loser == 1 else 1, reason="timeout")
+        self.broadcast_game_update()
+
 
 class HttpServer:
     def __init__(self):
+        # player_id -> session info for /resume; like the games, sessions live only as long as the process
         self.sessions = {}
+        # Shared secret for the /admin/* routes (X-Admin-Token header); None disables them
+        self.admin_token = None
         self.types = {'.pdf': 'application/pdf', '.jpg': 'image/jpeg', '.txt': 'text/plain', '.html': 'text/html'}
         self.games = {}
         self.waiting_players = queue.Queue()
         self.client_games = {}
         self.next_game_id = 1
+        self.game_id_lock = threading.Lock()
+        self.tournaments = {}
+        self.next_tournament_id = 1
+        self.clock_scheduler = ClockScheduler()
+        self.endgame_db = EndgameDB()  # Slices are memory-mapped on first lookup
+        self.analysis_depth = 6
+        self.analysis_max_nodes = 20000
+        self._analysis_cache = {}  # game_id -> (version, analysis)
+        self.default_time_control = None  # e.g. {"initial": 300, "increment": 5}, None for untimed games
+        self.tracer = RequestTracer()
+        self._status_lines = {}
+        self._static_cache = {}
+        self._date_second = None
+        self._date_line = b''
+        self.compress_min_size = 512  # Bodies smaller than this are sent uncompressed
+        self.compress_level = 6
+        self._compressed_states = {}  # (game_id, player_id, encoding) -> (etag, compressed body)
+
+    def _date_header(self):
+        """Date header line, re-rendered at most once per second"""
+        now = int(time.time())
+        if now != self._date_second:
+            self._date_line = f"Date: {datetime.now().strftime('%c')}\r\n".encode()
+            self._date_second = now
+            # Cached constant responses carry the old Date, drop them
+            self._static_cache.clear()
+        return self._date_line
+
+    def response(self, kode=404, message='Not Found', messagebody=b'', headers={}, encoding=None):
+        if isinstance(messagebody, str):
+            messagebody = messagebody.encode()
+        if encoding and len(messagebody) >= self.compress_min_size:
+            messagebody = self.compress(messagebody, encoding)
+            headers = dict(headers, **{'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'})
+
+        status_line = self._status_lines.get((kode, message))
+        if status_line is None:
+            status_line = f"HTTP/1.0 {kode} {message}\r\n".encode()
+            self._status_lines[(kode, message)] = status_line
 
-    def response(self, kode=404, message='Not Found', messagebody=b'', headers={}):
-        tanggal = datetime.now().strftime('%c')
+        # Collect the pre-encoded pieces and join once instead of concatenating
         resp = [
-            f"HTTP/1.0 {kode} {message}\r\n",
-            f"Date: {tanggal}\r\n",
-            "Connection: close\r\n",
-            "Server: myserver/1.0\r\n",
-            f"Content-Length: {len(messagebody)}\r\n"
+            status_line,
+            self._date_header(),
+            b"Connection: close\r\nServer: myserver/1.0\r\n",
+            b"Content-Length: %d\r\n" % len(messagebody)
         ]
         for kk, vv in headers.items():
-            resp.append(f"{kk}: {vv}\r\n")
-        resp.append("\r\n")
-
-        response_headers = "".join(resp)
-        
-        if isinstance(messagebody, str):
-            messagebody = messagebody.encode()
-            
-        return response_headers.encode() + messagebody
+            resp.append(f"{kk}: {vv}\r\n".encode())
+        resp.append(b"\r\n")
+        resp.append(messagebody)
+        return b"".join(resp)
+
+    def static_response(self, kode=404, message='Not Found', messagebody='', headers={}):
+        """Fully encoded response for constant replies, cached until the Date header changes"""
+        self._date_header()
+        key = (kode, message, messagebody, tuple(headers.items()))
+        cached = self._static_cache.get(key)
+        if cached is None:
+            cached = self.response(kode, message, messagebody, headers)
+            self._static_cache[key] = cached
+        return cached
+
+    def negotiate_encoding(self, headers):
+        """Pick gzip or deflate from the Accept-Encoding header, None for identity"""
+        accept = self.get_header(headers, 'Accept-Encoding')
+        if not accept:
+            return None
+        accepted = set()
+        for item in accept.split(','):
+            name, _, params = item.strip().partition(';')
+            if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                continue
+            accepted.add(name.strip().lower())
+        for encoding in ('gzip', 'deflate'):
+            if encoding in accepted:
+                return encoding
+        return None
+
+    def compress(self, body, encoding):
+        if encoding == 'gzip':
+            return gzip.compress(body, self.compress_level, mtime=0)
+        return zlib.compress(body, self.compress_level)
+
+    def get_header(self, headers, name):
+        name = name.lower()
+        for header in headers:
+            key, _, value = header.partition(':')
+            if key.strip().lower() == name:
+                return value.strip()
+        return None
 
     def proses(self, data):
         requests = data.split("\r\n")
@@ -273,6 +448,10 @@ class HttpServer:
         
         try:
             method, object_address, _ = baris.split(" ")
+            self.tracer.set_path(f"{method} {object_address}")
+            self.tracer.mark('parse')
+            if object_address.startswith('/admin/') and not self.is_admin(all_headers):
+                return self.static_response(403, 'Forbidden', 'Admin token required', {})
             if method.upper() == 'GET':
                 return self.http_get(object_address, all_headers)
             if method.upper() == 'POST':
@@ -285,9 +464,9 @@ class HttpServer:
                 body = data[body_start:body_start + content_length]
                 return self.http_post(object_address, all_headers, body)
             else:
-                return self.response(400, 'Bad Request', '', {})
+                return self.static_response(400, 'Bad Request', '', {})
         except ValueError:
-            return self.response(400, 'Bad Request', '', {})
+            return self.static_response(400, 'Bad Request', '', {})
 
     def http_get(self, object_address, headers):
         if object_address.startswith('/game_state'):
@@ -296,8 +475,38 @@ class HttpServer:
             player_id = params.get('player_id')
             game = self.games.get(game_id)
             if game:
-                return self.response(200, 'OK', json.dumps(game.get_state(player_id)), {'Content-Type': 'application/json'})
-            return self.response(404, 'Not Found', 'Game not found', {})
+                # The version changes with every move, game_time every second;
+                # each content coding is its own representation and gets its own ETag
+                game.update_game_time()
+                encoding = self.negotiate_encoding(headers)
+                etag = f'"{game.game_id}-{game.version}-{game.game_time}"'
+                if encoding:
+                    etag = f'{etag[:-1]}-{encoding}"'
+                if self.get_header(headers, 'If-None-Match') == etag:
+                    return self.response(304, 'Not Modified', b'', {'ETag': etag, 'Vary': 'Accept-Encoding'})
+
+                response_headers = {'Content-Type': 'application/json', 'ETag': etag, 'Vary': 'Accept-Encoding'}
+                # Only the game's own players are cached, at most two entries per game and encoding
+                key = (game_id, player_id, encoding) if encoding and player_id in game.players else None
+                if key:
+                    # Every poll of the same snapshot gets the already compressed bytes
+                    cached = self._compressed_states.get(key)
+                    if cached and cached[0] == etag:
+                        response_headers['Content-Encoding'] = encoding
+                        return self.response(200, 'OK', cached[1], response_headers)
+
+                state = game.get_state(player_id)
+                self.tracer.mark('get_state')
+                body = json.dumps(state).encode()
+                self.tracer.mark('json_dumps')
+                if encoding and len(body) >= self.compress_min_size:
+                    body = self.compress(body, encoding)
+                    self.tracer.mark('compress')
+                    if key:
+                        self._compressed_states[key] = (etag, body)
+                    response_headers['Content-Encoding'] = encoding
+                return self.response(200, 'OK', body, response_headers)
+            return self.static_response(404, 'Not Found', 'Game not found', {})
 
         elif object_address.startswith('/check_status'):
             params = self.parse_query_params(object_address)
@@ -313,17 +522,61 @@ class HttpServer:
 
             return self.response(200, 'OK', json.dumps(response_data), {'Content-Type': 'application/json'})
 
+        elif object_address.startswith('/analyze'):
+            params = self.parse_query_params(object_address)
+            game = self.games.get(params.get('game_id'))
+            if not game:
+                return self.static_response(404, 'Not Found', 'Game not found', {})
+
+            cached = self._analysis_cache.get(game.game_id)
+            if cached and cached[0] == game.version:
+                response_data = cached[1]
+            else:
+                # Read the version with the board so the cache entry labels the position analysed
+                with game.lock:
+                    version = game.version
+                    board = copy.deepcopy(game.board)
+                    current_player = game.current_player
+                response_data = analyze(board, current_player, self.endgame_db,
+                                        self.analysis_depth, self.analysis_max_nodes)
+                response_data.update({'game_id': game.game_id, 'version': version, 'game_state': game.state.value})
+                self._analysis_cache[game.game_id] = (version, response_data)
+            return self.response(200, 'OK', json.dumps(response_data), {'Content-Type': 'application/json'}, self.negotiate_encoding(headers))
+
+        elif object_address.startswith('/admin/trace'):
+            response_data = self.tracer.status()
+            response_data['traces'] = self.tracer.recent()
+            return self.response(200, 'OK', json.dumps(response_data), {'Content-Type': 'application/json'})
+
+        elif object_address.startswith('/admin/profile'):
+            return self.response(200, 'OK', self.tracer.profile_report(), {'Content-Type': 'text/plain'})
+
+        elif object_address.startswith('/admin/tournament'):
+            params = self.parse_query_params(object_address)
+            tournament_id = params.get('tournament_id')
+            if tournament_id is None:
+                response_data = {'tournaments': [
+                    {'tournament_id': t.tournament_id, 'name': t.name, 'format': t.format,
+                     'state': t.state, 'round': t.round}
+                    for t in self.tournaments.values()
+                ]}
+                return self.response(200, 'OK', json.dumps(response_data), {'Content-Type': 'application/json'}, self.negotiate_encoding(headers))
+            tournament = self.tournaments.get(tournament_id)
+            if not tournament:
+                return self.static_response(404, 'Not Found', 'Tournament not found', {})
+            return self.response(200, 'OK', json.dumps(tournament.summary()), {'Content-Type': 'application/json'}, self.negotiate_encoding(headers))
+
         # Default GET handling
         if object_address == '/':
-            return self.response(200, 'OK', 'Checkers Game Server is running.', {})
+            return self.static_response(200, 'OK', 'Checkers Game Server is running.', {})
 
-        return self.response(404, 'Not Found', '', {})
+        return self.static_response(404, 'Not Found', '', {})
 
     def http_post(self, object_address, headers, body):
         try:
             payload = json.loads(body) if body else {}
         except json.JSONDecodeError:
-            return self.response(400, 'Bad Request', 'Invalid JSON', {})
+            return self.static_response(400, 'Bad Request', 'Invalid JSON', {})
 
         if object_address == '/join_game':
             player_id = str(uuid.uuid4())
@@ -333,9 +586,11 @@ class HttpServer:
                 p1_id = self.waiting_players.get()
                 p2_id = self.waiting_players.get()
                 
-                game_id = str(self.next_game_id)
-                self.next_game_id += 1
+                game_id = self.allocate_game_ids(1)[0]
                 game = CheckersGame(game_id)
+                if self.default_time_control:
+                    tc = self.default_time_control
+                    game.set_time_control(tc["initial"], tc["increment"], self.clock_scheduler)
                 game.add_player(p1_id)
                 game.add_player(p2_id)
                 self.games[game_id] = game
@@ -345,9 +600,34 @@ class HttpServer:
                 response_data = {'player_id': player_id, 'game_id': game_id, 'status': 'game_started'}
             else:
                 response_data = {'player_id': player_id, 'status': 'waiting_for_opponent'}
+            response_data['token'] = self.issue_token(player_id)
             
             return self.response(200, 'OK', json.dumps(response_data), {'Content-Type': 'application/json'})
 
+        elif object_address == '/resume':
+            # {"token": "<player_id>.<random>"} as handed out by /join_game
+            player_id = self.verify_token(payload.get('token'))
+            if not player_id:
+                return self.static_response(403, 'Forbidden', 'Invalid session token', {})
+            session = self.sessions[player_id]
+            session['resumes'] += 1
+            session['last_resume'] = time.time()
+
+            game = self.games.get(self.client_games.get(player_id))
+            if game:
+                response_data = {
+                    'status': 'resumed',
+                    'player_id': player_id,
+                    'game_id': game.game_id,
+                    'version': game.version,
+                    'state': game.get_state(player_id)
+                }
+            else:
+                # Still queued in waiting_players, keep waiting with the same id
+                response_data = {'status': 'waiting_for_opponent', 'player_id': player_id}
+            print(f"Player {player_id} resumed session ({response_data['status']})")
+            return self.response(200, 'OK', json.dumps(response_data), {'Content-Type': 'application/json'}, self.negotiate_encoding(headers))
+
         elif object_address == '/make_move':
             game_id = payload.get('game_id')
             player_id = payload.get('player_id')
@@ -356,9 +636,15 @@ class HttpServer:
             game = self.games.get(game_id)
 
             if game and game.make_move(player_id, tuple(from_pos), tuple(to_pos)):
-                return self.response(200, 'OK', json.dumps(game.get_state(player_id)), {'Content-Type': 'application/json'})
+                self.tracer.mark('make_move')
+                state = game.get_state(player_id)
+                self.tracer.mark('get_state')
+                body = json.dumps(state)
+                self.tracer.mark('json_dumps')
+                return self.response(200, 'OK', body, {'Content-Type': 'application/json'}, self.negotiate_encoding(headers))
             else:
-                return self.response(400, 'Bad Request', 'Invalid move', {})
+                self.tracer.mark('make_move')
+                return self.static_response(400, 'Bad Request', 'Invalid move', {})
 
         elif object_address == '/restart_game':
             game_id = payload.get('game_id')
@@ -367,10 +653,13 @@ class HttpServer:
             # Validate that the game exists and player is part of it
             game = self.games.get(game_id)
             if not game:
-                return self.response(404, 'Not Found', 'Game not found', {})
+                return self.static_response(404, 'Not Found', 'Game not found', {})
             
             if player_id not in game.players:
-                return self.response(403, 'Forbidden', 'Player not in this game', {})
+                return self.static_response(403, 'Forbidden', 'Player not in this game', {})
+
+            if game.tournament_id:
+                return self.static_response(403, 'Forbidden', 'Tournament games cannot be restarted', {})
             
             # Request restart (requires both players' consent)
             result = game.request_restart(player_id)
@@ -378,14 +667,110 @@ class HttpServer:
             if result["status"] == "game_restarted":
                 print(f"Game {game_id} restarted - both players agreed")
                 # Return the new game state
-                return self.response(200, 'OK', json.dumps(game.get_state(player_id)), {'Content-Type': 'application/json'})
+                return self.response(200, 'OK', json.dumps(game.get_state(player_id)), {'Content-Type': 'application/json'}, self.negotiate_encoding(headers))
             elif result["status"] == "restart_requested":
                 print(f"Game {game_id}: Player {player_id} requested restart, waiting for other player")
                 return self.response(200, 'OK', json.dumps(result), {'Content-Type': 'application/json'})
             else:
                 return self.response(400, 'Bad Request', json.dumps(result), {'Content-Type': 'application/json'})
+
+        elif object_address == '/admin/trace':
+            # {"enabled": true, "slow_threshold_ms": 50}
+            self.tracer.configure(payload.get('enabled'), payload.get('slow_threshold_ms'))
+            return self.response(200, 'OK', json.dumps(self.tracer.status()), {'Content-Type': 'application/json'})
+
+        elif object_address == '/admin/tournament':
+            # {"name": "Spring Cup", "format": "round_robin" | "bracket", "players": ["alice", "bob", ...],
+            #  "time_control": {"initial": 300, "increment": 5}}
+            # Allocated up front because the games are created in the constructor; rejected requests leave a gap
+            tournament_id = self.allocate_tournament_id()
+            try:
+                tournament = Tournament(tournament_id, payload.get('name'), payload.get('players'),
+                                        payload.get('format', 'round_robin'), self.create_games,
+                                        self.parse_time_control(payload.get('time_control')))
+            except ValueError as e:
+                return self.response(400, 'Bad Request', json.dumps({'error': str(e)}), {'Content-Type': 'application/json'})
+            self.tournaments[tournament_id] = tournament
+            print(f"Tournament {tournament_id} created with {len(tournament.player_ids)} players")
+            response_data = tournament.summary(include_players=True)
+            response_data['tokens'] = {name: self.issue_token(pid) for name, pid in tournament.player_ids.items()}
+            return self.response(200, 'OK', json.dumps(response_data), {'Content-Type': 'application/json'}, self.negotiate_encoding(headers))
+
+        elif object_address == '/admin/profile':
+            # {"enabled": true, "sample_rate": 10, "reset": false}
+            if payload.get('enabled'):
+                self.tracer.start_profiling(payload.get('sample_rate'), payload.get('reset', False))
+            else:
+                self.tracer.stop_profiling()
+            return self.response(200, 'OK', json.dumps(self.tracer.status()), {'Content-Type': 'application/json'})
         
-        return self.response(404, 'Not Found', '', {})
+        return self.static_response(404, 'Not Found', '', {})
+
+    def is_admin(self, headers):
+        if not self.admin_token:
+            return False
+        supplied = self.get_header(headers, 'X-Admin-Token') or ''
+        return hmac.compare_digest(supplied.encode(), self.admin_token.encode())
+
+    def issue_token(self, player_id):
+        """Random token that lets a player resume after losing its connection or client process"""
+        token = f"{player_id}.{secrets.token_urlsafe(32)}"
+        self.sessions[player_id] = {'token': token, 'issued': time.time(), 'resumes': 0}
+        return token
+
+    def verify_token(self, token):
+        """Return the player id of a valid token, None otherwise"""
+        if not isinstance(token, str):
+            return None
+        player_id = token.rpartition('.')[0]
+        session = self.sessions.get(player_id)
+        if not session or not hmac.compare_digest(token.encode(), session['token'].encode()):
+            return None
+        return player_id
+
+    def allocate_tournament_id(self):
+        with self.game_id_lock:
+            tournament_id = self.next_tournament_id
+            self.next_tournament_id += 1
+        return str(tournament_id)
+
+    def allocate_game_ids(self, count):
+        with self.game_id_lock:
+            first = self.next_game_id
+            self.next_game_id += count
+        return [str(i) for i in range(first, first + count)]
+
+    def parse_time_control(self, value):
+        """Validate a {"initial": seconds, "increment": seconds} spec, None means untimed"""
+        if value is None:
+            return None
+        try:
+            initial = float(value["initial"])
+            increment = float(value.get("increment", 0))
+        except (TypeError, KeyError, AttributeError):
+            raise ValueError("time_control needs numeric 'initial' and optional 'increment'")
+        # NaN would poison the shared clock heap, Infinity would silently mean untimed
+        if not (math.isfinite(initial) and math.isfinite(increment)):
+            raise ValueError("time_control values must be finite numbers")
+        if initial <= 0 or increment < 0:
+            raise ValueError("time_control 'initial' must be positive and 'increment' must not be negative")
+        return {"initial": initial, "increment": increment}
+
+    def create_games(self, pairings, tournament_id=None, time_control=None):
+        """Create and start one game per (player1_id, player2_id) pair in a single step"""
+        games = []
+        for game_id, (p1_id, p2_id) in zip(self.allocate_game_ids(len(pairings)), pairings):
+            game = CheckersGame(game_id)
+            game.tournament_id = tournament_id
+            if time_control:
+                game.set_time_control(time_control["initial"], time_control["increment"], self.clock_scheduler)
+            game.add_player(p1_id)
+            game.add_player(p2_id)
+            self.games[game_id] = game
+            self.client_games[p1_id] = game_id
+            self.client_games[p2_id] = game_id
+            games.append(game)
+        return games
 
     def parse_query_params(self, path):
         params = {}
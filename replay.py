@@ -0,0 +1,258 @@
+"""Replay traffic captured with CHECKERS_CAPTURE against a running server.
+
+    python replay.py traffic.jsonl                       # original pacing (1x)
+    python replay.py traffic.jsonl --speed 4             # 4x faster
+    python replay.py traffic.jsonl --speed max           # as fast as possible
+    python replay.py traffic.jsonl --host 10.0.0.5 --port 8080 --workers 50
+    python replay.py traffic.jsonl --speed max --workers 1   # strictly sequential
+
+Concurrent replay can reorder requests that were captured close together
+(e.g. two /join_game calls), which shows up as divergences.
+"""
+import argparse
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from capture import decode_body
+
+
+def load_capture(path):
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    entries.sort(key=lambda e: e["ts"])
+    return entries
+
+
+def parse_response(data):
+    head, _, body = data.partition(b'\r\n\r\n')
+    parts = head.split(b'\r\n', 1)[0].decode('latin-1').split(' ', 2)
+    status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+    return status, decode_body(head, body).decode('utf-8', 'replace')
+
+
+def json_or_none(text):
+    try:
+        value = json.loads(text)
+    except (ValueError, TypeError):
+        return None
+    return value if isinstance(value, dict) else None
+
+
+ID_KEYS = ('player_id', 'game_id', 'token')
+# Tournament creation hands out one id and one token per entrant, keyed by name
+ID_MAPS = ('players', 'tokens')
+
+
+def request_ids(raw):
+    """Return the player/game ids and session tokens a request refers to"""
+    head, _, body = raw.partition('\r\n\r\n')
+    request_line = head.split('\r\n', 1)[0]
+    parts = request_line.split(' ')
+    ids = []
+    if len(parts) == 3 and '?' in parts[1]:
+        for part in parts[1].split('?', 1)[1].split('&'):
+            key, _, value = part.partition('=')
+            if key in ID_KEYS and value:
+                ids.append(value)
+    doc = json_or_none(body)
+    if doc:
+        ids.extend(str(doc[key]) for key in ID_KEYS if doc.get(key))
+    return ids
+
+
+def response_ids(doc):
+    """(slot, value) pairs for every id or token a captured response hands out"""
+    pairs = [(key, doc[key]) for key in ID_KEYS if doc.get(key)]
+    for key in ID_MAPS:
+        if isinstance(doc.get(key), dict):
+            pairs.extend(((key, name), value) for name, value in doc[key].items() if value)
+    return pairs
+
+
+class Replayer:
+    """Re-issues captured requests and compares the replies with the captured ones.
+
+    Player ids, game ids and session tokens are assigned by the server, so
+    those seen in captured responses are mapped to the ones the replay target
+    hands out. A request that refers to such an id waits until the request
+    that produced it has been replayed, then has its player_id/game_id/token
+    fields rewritten.
+    """
+
+    def __init__(self, host, port, speed=1.0, workers=20, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.workers = workers
+        self.timeout = timeout
+        self.id_map = {}
+        self.producers = {}
+        self.done = []
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.errors = 0
+        self.divergences = []
+        self.elapsed = 0.0
+
+    def map_id(self, value):
+        with self.lock:
+            return self.id_map.get(str(value), value)
+
+    def rewrite(self, raw):
+        head, sep, body = raw.partition('\r\n\r\n')
+        # Captured ETags name the captured game ids and clocks, they can never match the replay target
+        lines = [line for line in head.split('\r\n') if not line.lower().startswith('if-none-match:')]
+        parts = lines[0].split(' ')
+        if len(parts) == 3 and '?' in parts[1]:
+            path, query = parts[1].split('?', 1)
+            params = []
+            for part in query.split('&'):
+                key, eq, value = part.partition('=')
+                if key in ID_KEYS:
+                    value = self.map_id(value)
+                params.append(f"{key}{eq}{value}")
+            parts[1] = path + '?' + '&'.join(params)
+            lines[0] = ' '.join(parts)
+
+        doc = json_or_none(body)
+        if doc and any(key in doc for key in ID_KEYS):
+            for key in ID_KEYS:
+                if doc.get(key):
+                    doc[key] = self.map_id(doc[key])
+            body = json.dumps(doc)
+            lines = [
+                f"Content-Length: {len(body.encode())}" if line.lower().startswith('content-length:') else line
+                for line in lines
+            ]
+        return '\r\n'.join(lines) + sep + body
+
+    def learn_ids(self, captured_body, replay_body):
+        captured, replayed = json_or_none(captured_body), json_or_none(replay_body)
+        if not captured or not replayed:
+            return
+        replayed = dict(response_ids(replayed))
+        with self.lock:
+            for slot, old in response_ids(captured):
+                new = replayed.get(slot)
+                if new:
+                    self.id_map[str(old)] = new
+
+    def send(self, raw):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall(raw.encode())
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return b''.join(chunks)
+
+    def replay_one(self, index, entry):
+        try:
+            for old_id in request_ids(entry["request"]):
+                producer = self.producers.get(old_id)
+                if producer is not None and producer < index:
+                    self.done[producer].wait(self.timeout)
+            self._replay(index, entry)
+        finally:
+            self.done[index].set()
+
+    def _replay(self, index, entry):
+        raw = self.rewrite(entry["request"])
+        start = time.perf_counter()
+        try:
+            data = self.send(raw)
+        except OSError as e:
+            with self.lock:
+                self.errors += 1
+            print(f"#{index} request failed: {e}")
+            return
+        latency = (time.perf_counter() - start) * 1000
+        status, body = parse_response(data)
+        self.learn_ids(entry.get("response_body"), body)
+
+        captured_doc, replay_doc = json_or_none(entry.get("response_body")), json_or_none(body)
+        captured_status = entry.get("status")
+        # A captured 304 was a conditional poll; replayed unconditionally it is a 200
+        diverged = status != captured_status and not (captured_status == 304 and status == 200)
+        if not diverged and captured_doc and replay_doc:
+            diverged = captured_doc.get("status") != replay_doc.get("status")
+
+        with self.lock:
+            self.latencies.append(latency)
+            if diverged:
+                self.divergences.append({
+                    "index": index,
+                    "request": raw.split('\r\n', 1)[0],
+                    "captured_status": entry.get("status"),
+                    "replay_status": status
+                })
+
+    def run(self, entries):
+        if not entries:
+            return
+        # Remember which captured response first handed out each id
+        for index, entry in enumerate(entries):
+            doc = json_or_none(entry.get("response_body"))
+            if doc:
+                for _, value in response_ids(doc):
+                    self.producers.setdefault(str(value), index)
+        self.done = [threading.Event() for _ in entries]
+
+        first_ts = entries[0]["ts"]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.workers) as executor:
+            for index, entry in enumerate(entries):
+                if self.speed:
+                    due = (entry["ts"] - first_ts) / self.speed
+                    delay = due - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                executor.submit(self.replay_one, index, entry)
+        self.elapsed = time.perf_counter() - started
+
+    def report(self, total):
+        print(f"Replayed {total} requests in {self.elapsed:.2f}s "
+              f"({total / self.elapsed if self.elapsed else 0:.1f} req/s), {self.errors} errors")
+        if self.latencies:
+            latencies = sorted(self.latencies)
+
+            def pct(p):
+                return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+            print(f"Latency ms: mean {statistics.mean(latencies):.2f}  p50 {pct(50):.2f}  "
+                  f"p90 {pct(90):.2f}  p99 {pct(99):.2f}  max {latencies[-1]:.2f}")
+        print(f"Divergences: {len(self.divergences)}")
+        for d in self.divergences[:20]:
+            print(f"  #{d['index']} {d['request']}: captured {d['captured_status']}, replay {d['replay_status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured Checkers traffic")
+    parser.add_argument('capture', help="JSONL file written with CHECKERS_CAPTURE")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--speed', default='1', help="speed multiplier (1, 2, 10, ...) or 'max'")
+    parser.add_argument('--workers', type=int, default=20)
+    parser.add_argument('--timeout', type=float, default=5.0)
+    args = parser.parse_args()
+
+    speed = 0 if args.speed == 'max' else float(args.speed)
+    entries = load_capture(args.capture)
+    replayer = Replayer(args.host, args.port, speed, args.workers, args.timeout)
+    replayer.run(entries)
+    replayer.report(len(entries))
+    return 1 if replayer.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
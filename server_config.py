@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import socket
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'on'):
+        return True
+    if text in ('0', 'false', 'no', 'off', ''):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def parse_time_control(value):
+    """Accept {"initial": 300, "increment": 5}, its JSON text, or the "300+5" shorthand"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, dict):
+        return value
+    text = str(value).strip()
+    if text.startswith('{'):
+        return json.loads(text)
+    initial, _, increment = text.partition('+')
+    return {"initial": float(initial), "increment": float(increment or 0)}
+
+
+def optional_str(value):
+    return str(value) if value not in (None, '') else None
+
+
+def optional_float(value):
+    return float(value) if value not in (None, '') else None
+
+
+# name -> (parser, default, environment variable, help)
+SETTINGS = {
+    "host": (str, "0.0.0.0", "CHECKERS_HOST", "address to bind"),
+    "port": (int, 8080, "CHECKERS_PORT", "TCP port to listen on"),
+    "backlog": (int, 128, "CHECKERS_BACKLOG", "listen() backlog"),
+    "workers": (int, 20, "CHECKERS_WORKERS", "request worker threads"),
+    "recv_buffer": (int, 4096, "CHECKERS_RECV_BUFFER", "bytes read per recv() call"),
+    "tcp_nodelay": (parse_bool, True, "CHECKERS_TCP_NODELAY", "disable Nagle's algorithm on client sockets"),
+    "so_rcvbuf": (int, 0, "CHECKERS_SO_RCVBUF", "SO_RCVBUF in bytes, 0 keeps the OS default"),
+    "so_sndbuf": (int, 0, "CHECKERS_SO_SNDBUF", "SO_SNDBUF in bytes, 0 keeps the OS default"),
+    "client_timeout": (float, 10.0, "CHECKERS_CLIENT_TIMEOUT", "seconds a client may stay idle mid-request"),
+    "shutdown_timeout": (float, 10.0, "CHECKERS_SHUTDOWN_TIMEOUT", "seconds to wait for in-flight requests on shutdown"),
+    "trace": (parse_bool, False, "CHECKERS_TRACE", "enable request tracing"),
+    "trace_slow_ms": (optional_float, None, "CHECKERS_TRACE_SLOW_MS", "slow request threshold in ms"),
+    "capture": (optional_str, None, "CHECKERS_CAPTURE", "capture traffic to this JSONL file"),
+    "admin_token": (optional_str, None, "CHECKERS_ADMIN_TOKEN", "shared secret for /admin/* (X-Admin-Token header)"),
+    "time_control": (parse_time_control, None, "CHECKERS_TIME_CONTROL", "default time control, e.g. 300+5"),
+    "compress_min_size": (int, 512, "CHECKERS_COMPRESS_MIN_SIZE", "smallest body worth compressing"),
+    "endgame_db": (optional_str, None, "CHECKERS_ENDGAME_DB", "endgame tablebase directory"),
+}
+
+
+class ServerConfig:
+    """Effective server settings, layered defaults < config file < environment < CLI flags.
+
+    The config file is JSON using the setting names as keys. `sources` records
+    where each value came from so the startup self-check can print it.
+    """
+
+    def __init__(self, **values):
+        self.sources = {}
+        self.check_only = False
+        for name, (_, default, _, _) in SETTINGS.items():
+            setattr(self, name, default)
+            self.sources[name] = "default"
+        self.update(values, "code")
+
+    def update(self, values, source):
+        for name, value in values.items():
+            if name not in SETTINGS:
+                raise ValueError(f"Unknown setting '{name}' ({source})")
+            parser, default = SETTINGS[name][:2]
+            # Only the optional settings (default None) accept null, their parsers handle it
+            if value is None and default is not None:
+                raise ValueError(f"Invalid value for '{name}' ({source}): null is not allowed")
+            try:
+                setattr(self, name, parser(value))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Invalid value for '{name}' ({source}): {value!r}: {e}")
+            self.sources[name] = source
+
+    def load_file(self, path):
+        with open(path) as f:
+            values = json.load(f)
+        if not isinstance(values, dict):
+            raise ValueError(f"{path} must contain a JSON object")
+        self.update(values, f"file {path}")
+
+    def load_env(self, environ=None):
+        environ = os.environ if environ is None else environ
+        for name, (_, _, env, _) in SETTINGS.items():
+            if env in environ:
+                self.update({name: environ[env]}, f"env {env}")
+
+    @classmethod
+    def from_sources(cls, argv=None, environ=None):
+        parser = argparse.ArgumentParser(description="Checkers HTTP server")
+        parser.add_argument('--config', help="JSON config file (or CHECKERS_CONFIG)")
+        parser.add_argument('--check', action='store_true', help="run the startup self-check and exit")
+        for name, (_, _, env, help_text) in SETTINGS.items():
+            # Parsed by ServerConfig.update so every source goes through the same validation
+            parser.add_argument('--' + name.replace('_', '-'), dest=name, default=None, help=f"{help_text} [{env}]")
+        args = parser.parse_args(argv)
+
+        environ = os.environ if environ is None else environ
+        config = cls()
+        config_path = args.config or environ.get('CHECKERS_CONFIG')
+        if config_path:
+            config.load_file(config_path)
+        config.load_env(environ)
+        for name in SETTINGS:
+            value = getattr(args, name)
+            if value is not None:
+                config.update({name: value}, "cli")
+        config.check_only = args.check
+        return config
+
+    def validate(self):
+        problems = []
+        if not 0 <= self.port <= 65535:
+            problems.append(f"port {self.port} is out of range")
+        for name in ('backlog', 'workers', 'recv_buffer'):
+            if getattr(self, name) < 1:
+                problems.append(f"{name} must be at least 1")
+        for name in ('so_rcvbuf', 'so_sndbuf', 'compress_min_size'):
+            if getattr(self, name) < 0:
+                problems.append(f"{name} must not be negative")
+        for name in ('client_timeout', 'shutdown_timeout'):
+            if getattr(self, name) <= 0:
+                problems.append(f"{name} must be positive")
+        return problems
+
+    def apply_socket_options(self, sock):
+        """Buffer sizes go on the listening socket before listen() so accepted sockets inherit them"""
+        if self.so_rcvbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.so_rcvbuf)
+        if self.so_sndbuf:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.so_sndbuf)
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in SETTINGS}
+        if data["admin_token"]:
+            data["admin_token"] = "***"
+        return data
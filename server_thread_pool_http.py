@@ -1,16 +1,31 @@
 from socket import *
 import socket
 import logging
+import sys
+import signal
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from http_server import HttpServer
+from capture import TrafficCapture
+from endgame import EndgameDB
+from server_config import ServerConfig
 
 httpserver = HttpServer()
+tracer = httpserver.tracer
+capture = None
+config = ServerConfig()
+
+# Connections accepted but not yet answered, drained on shutdown
+in_flight = 0
+in_flight_cond = threading.Condition()
 
 def ProcessTheClient(connection, address):
+    trace = tracer.begin(address)
     rcv = ""
     while True:
         try:
-            data = connection.recv(1024)
+            data = connection.recv(config.recv_buffer)
             if data:
                 d = data.decode('utf-8', 'ignore')
                 rcv += d
@@ -21,14 +36,23 @@ def ProcessTheClient(connection, address):
                         if line.lower().startswith('content-length:'):
                             content_length = int(line.split(':')[1].strip())
                             break
-                    
+
                     header_end = rcv.find('\r\n\r\n')
                     body_received = len(rcv) - (header_end + 4)
 
                     if body_received >= content_length:
+                        tracer.mark('recv')
+                        if capture:
+                            received_at = time.time()
+                            started = time.perf_counter()
                         hasil = httpserver.proses(rcv)
+                        tracer.mark('response')
                         connection.sendall(hasil)
+                        tracer.mark('send')
+                        if capture:
+                            capture.record(address, rcv, hasil, (time.perf_counter() - started) * 1000, received_at)
                         connection.close()
+                        tracer.finish(trace)
                         return
             else:
                 break
@@ -36,24 +60,139 @@ def ProcessTheClient(connection, address):
             # logging.error(f"Error processing client {address}: {e}")
             break
     connection.close()
+    tracer.finish(trace)
+
+
+def HandleClient(connection, address):
+    global in_flight
+    try:
+        ProcessTheClient(connection, address)
+    finally:
+        with in_flight_cond:
+            in_flight -= 1
+            in_flight_cond.notify_all()
+
+
+def ApplyConfig(cfg):
+    """Push the effective settings into the HttpServer and optional subsystems"""
+    global capture, config
+    config = cfg
+    tracer.configure(cfg.trace, cfg.trace_slow_ms)
+    httpserver.admin_token = cfg.admin_token
+    httpserver.default_time_control = httpserver.parse_time_control(cfg.time_control)
+    httpserver.compress_min_size = cfg.compress_min_size
+    if cfg.endgame_db:
+        httpserver.endgame_db = EndgameDB(cfg.endgame_db)
+    if cfg.capture:
+        capture = TrafficCapture(cfg.capture)
 
 
-def Server():
-    the_clients = []
+def SelfCheck(cfg, my_socket):
+    """Print the effective settings and what the kernel actually granted"""
+    print("Effective server settings:")
+    for name, value in cfg.as_dict().items():
+        print(f"  {name:<18} {str(value):<24} ({cfg.sources[name]})")
+
+    # Linux doubles requested buffer sizes for bookkeeping, so report the real values
+    rcvbuf = my_socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    sndbuf = my_socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+    print(f"  socket buffers     rcvbuf={rcvbuf} sndbuf={sndbuf} (kernel)")
+
+    warnings = []
+    if cfg.so_rcvbuf and rcvbuf < cfg.so_rcvbuf:
+        warnings.append(f"SO_RCVBUF capped at {rcvbuf} (see net.core.rmem_max)")
+    if cfg.so_sndbuf and sndbuf < cfg.so_sndbuf:
+        warnings.append(f"SO_SNDBUF capped at {sndbuf} (see net.core.wmem_max)")
+    try:
+        with open('/proc/sys/net/core/somaxconn') as f:
+            somaxconn = int(f.read())
+        if cfg.backlog > somaxconn:
+            warnings.append(f"backlog {cfg.backlog} is truncated to net.core.somaxconn={somaxconn}")
+    except (OSError, ValueError):
+        pass
+    if not cfg.admin_token:
+        warnings.append("no admin_token set, /admin/* endpoints are disabled")
+    if httpserver.endgame_db.max_pieces == 0:
+        warnings.append(f"no endgame tablebase in {httpserver.endgame_db.directory}, /analyze falls back to search")
+    for warning in warnings:
+        print(f"  warning: {warning}")
+    return warnings
+
+
+def Server(cfg=None):
+    global in_flight
+    cfg = cfg or ServerConfig()
+    problems = cfg.validate()
+    if problems:
+        for problem in problems:
+            print(f"Invalid configuration: {problem}")
+        sys.exit(1)
+    try:
+        ApplyConfig(cfg)
+    except (ValueError, OSError) as e:
+        print(f"Invalid configuration: {e}")
+        sys.exit(1)
+
     my_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     my_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    cfg.apply_socket_options(my_socket)
+
+    my_socket.bind((cfg.host, cfg.port))
+    my_socket.listen(cfg.backlog)
+    SelfCheck(cfg, my_socket)
+    if cfg.check_only:
+        my_socket.close()
+        if capture:
+            capture.close()
+        return
 
-    my_socket.bind(('0.0.0.0', 8080))
-    my_socket.listen(5)
-    print("Checkers HTTP server started on port 8080")
+    # SIGINT/SIGTERM stop accepting; the accept timeout lets the loop notice
+    stopping = threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: stopping.set())
+    my_socket.settimeout(0.5)
+    print(f"Checkers HTTP server started on {cfg.host}:{cfg.port} with {cfg.workers} workers")
 
-    with ThreadPoolExecutor(20) as executor:
-        while True:
-            connection, client_address = my_socket.accept()
-            executor.submit(ProcessTheClient, connection, client_address)
+    executor = ThreadPoolExecutor(cfg.workers)
+    try:
+        while not stopping.is_set():
+            try:
+                connection, client_address = my_socket.accept()
+            except socket.timeout:
+                continue
+            except InterruptedError:
+                continue
+            connection.settimeout(cfg.client_timeout)
+            if cfg.tcp_nodelay:
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with in_flight_cond:
+                in_flight += 1
+            executor.submit(HandleClient, connection, client_address)
+    finally:
+        my_socket.close()
+        print(f"Shutting down, draining {in_flight} in-flight request(s)")
+        deadline = time.monotonic() + cfg.shutdown_timeout
+        with in_flight_cond:
+            while in_flight and time.monotonic() < deadline:
+                in_flight_cond.wait(deadline - time.monotonic())
+            left = in_flight
+        if left:
+            print(f"Shutdown timeout reached, {left} request(s) still running")
+        # Idle clients are bounded by client_timeout, so the workers finish on their own
+        executor.shutdown(wait=not left, cancel_futures=True)
+        httpserver.clock_scheduler.stop()
+        if capture:
+            capture.close()
+        print("Server stopped")
 
 def main():
-    Server()
+    try:
+        cfg = ServerConfig.from_sources()
+    except (ValueError, OSError) as e:
+        print(f"Invalid configuration: {e}")
+        sys.exit(1)
+    Server(cfg)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,168 @@
+import threading
+import uuid
+
+
+def round_robin_pairings(player_ids, round_index):
+    """Circle-method pairings for one round; over len(player_ids) - 1 rounds
+    (rounded up to even) every player meets every other player once"""
+    players = list(player_ids)
+    if len(players) % 2:
+        players.append(None)  # Bye
+    n = len(players)
+    # The first player stays put, the others rotate one seat per round
+    shift = round_index % (n - 1)
+    others = players[1:]
+    if shift:
+        others = others[-shift:] + others[:-shift]
+    players = [players[0]] + others
+
+    pairs = []
+    for i in range(n // 2):
+        p1, p2 = players[i], players[n - 1 - i]
+        if p1 is None or p2 is None:
+            continue
+        # Alternate who moves first between rounds
+        pairs.append((p1, p2) if round_index % 2 == 0 else (p2, p1))
+    return pairs
+
+
+def round_robin_rounds(player_count):
+    return player_count - 1 if player_count % 2 == 0 else player_count
+
+
+class Tournament:
+    """Round-robin or single-elimination event played on many CheckersGame boards.
+
+    create_games(pairings, tournament_id, time_control) is supplied by HttpServer and returns
+    one started CheckersGame per (player1_id, player2_id) pair. Results arrive
+    through CheckersGame.on_game_over, and the next round is created as soon as
+    the last game of the current round is over.
+    """
+    FORMATS = ('round_robin', 'bracket')
+
+    def __init__(self, tournament_id, name, players, tournament_format, create_games, time_control=None):
+        if tournament_format not in self.FORMATS:
+            raise ValueError(f"Unknown tournament format: {tournament_format}")
+        if not isinstance(players, list) or len(players) < 2:
+            raise ValueError("A tournament needs at least 2 players")
+        if not all(isinstance(p, str) for p in players):
+            raise ValueError("Player names must be strings")
+        if len(set(players)) != len(players):
+            raise ValueError("Player names must be unique")
+
+        self.tournament_id = tournament_id
+        self.name = name or f"Tournament {tournament_id}"
+        self.format = tournament_format
+        self.create_games = create_games
+        self.time_control = time_control
+        self.lock = threading.Lock()
+
+        self.player_ids = {str(p): str(uuid.uuid4()) for p in players}
+        self.names = {pid: name for name, pid in self.player_ids.items()}
+        self.stats = {pid: {"played": 0, "wins": 0, "losses": 0} for pid in self.names}
+
+        self.state = "running"
+        self.round = 0
+        self.rounds = []  # list of lists of game ids
+        self.pending = set()
+        self.slots = {}  # game_id -> position in the current round
+        self.results = {}  # game_id -> winner player id
+        self.round_winners = []
+        self.byes = []
+        self.champion = None
+
+        self.total_rounds = None
+        if tournament_format == 'round_robin':
+            self.seating = list(self.names)
+            self.total_rounds = round_robin_rounds(len(self.seating))
+            first = round_robin_pairings(self.seating, 0)
+        else:
+            first = self.pair_bracket(list(self.names))
+
+        with self.lock:
+            self.start_round(first)
+
+    def pair_bracket(self, player_ids):
+        # Byes fill the field up to a power of two, so they all fall in the first
+        # round and every later round pairs off evenly
+        size = 1
+        while size < len(player_ids):
+            size *= 2
+        bye_count = size - len(player_ids)
+        self.byes = player_ids[:bye_count]
+        rest = player_ids[bye_count:]
+        return [(rest[i], rest[i + 1]) for i in range(0, len(rest), 2)]
+
+    def start_round(self, pairings):
+        games = self.create_games(pairings, self.tournament_id, self.time_control)
+        self.round += 1
+        self.round_winners = []
+        self.rounds.append([game.game_id for game in games])
+        self.pending = {game.game_id for game in games}
+        self.slots = {game.game_id: i for i, game in enumerate(games)}
+        for game in games:
+            game.on_game_over = self.record_result
+
+    def record_result(self, game):
+        with self.lock:
+            if game.game_id not in self.pending:
+                return
+            self.pending.discard(game.game_id)
+
+            winner_id = None
+            for player_id, info in game.players.items():
+                self.stats[player_id]["played"] += 1
+                if info["game_position"] == game.winner:
+                    winner_id = player_id
+                    self.stats[player_id]["wins"] += 1
+                else:
+                    self.stats[player_id]["losses"] += 1
+            self.results[game.game_id] = winner_id
+            self.round_winners.append((self.slots[game.game_id], winner_id))
+
+            if not self.pending:
+                self.advance()
+
+    def advance(self):
+        if self.format == 'round_robin':
+            if self.round < self.total_rounds:
+                self.start_round(round_robin_pairings(self.seating, self.round))
+                return
+            ranking = self.ranked_ids()
+            self.champion = ranking[0] if ranking else None
+        else:
+            # Keep bracket order so the draw stays predictable
+            advancing = self.byes + [winner for _, winner in sorted(self.round_winners)]
+            if len(advancing) > 1:
+                self.start_round(self.pair_bracket(advancing))
+                return
+            self.champion = advancing[0] if advancing else None
+        self.state = "finished"
+        print(f"Tournament {self.tournament_id} finished, champion: {self.names.get(self.champion)}")
+
+    def ranked_ids(self):
+        return sorted(self.stats, key=lambda pid: (-self.stats[pid]["wins"], self.stats[pid]["losses"], self.names[pid]))
+
+    def standings(self):
+        # Player ids act as credentials for /make_move, so the public table only has names
+        return [{"name": self.names[pid], **self.stats[pid]} for pid in self.ranked_ids()]
+
+    def summary(self, include_players=False):
+        with self.lock:
+            data = {
+                "tournament_id": self.tournament_id,
+                "name": self.name,
+                "format": self.format,
+                "time_control": self.time_control,
+                "state": self.state,
+                "round": self.round,
+                "total_rounds": self.total_rounds,
+                "games_played": len(self.results),
+                "current_round_games": self.rounds[-1] if self.rounds else [],
+                "pending_games": len(self.pending),
+                "champion": self.names.get(self.champion),
+                "standings": self.standings()
+            }
+            if include_players:
+                data["players"] = self.player_ids
+            return data
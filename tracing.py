@@ -0,0 +1,148 @@
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+from collections import deque
+
+
+class RequestTrace:
+    """Per-phase timings of a single request"""
+    __slots__ = ('address', 'path', 'start', 'last', 'phases', 'total_ms', 'profiled')
+
+    def __init__(self, address=None):
+        self.address = address
+        self.path = None
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = {}
+        self.total_ms = 0.0
+        self.profiled = False
+
+    def mark(self, phase):
+        """Attribute the time since the previous mark to `phase`"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+    def to_dict(self):
+        return {
+            "address": str(self.address) if self.address else None,
+            "path": self.path,
+            "total_ms": round(self.total_ms, 3),
+            "phases": {k: round(v, 3) for k, v in self.phases.items()},
+            "profiled": self.profiled
+        }
+
+
+class RequestTracer:
+    """Opt-in request tracing with a ring buffer of recent traces and sampling cProfile.
+
+    When disabled, begin() returns None and mark() is a single attribute check,
+    so the request pipeline pays almost nothing for the hooks.
+    """
+
+    def __init__(self, enabled=False, capacity=1024, slow_threshold_ms=100.0):
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self.traces = deque(maxlen=capacity)
+        self._local = threading.local()
+
+        # Sampling profiler: every `sample_rate`-th traced request runs under cProfile
+        self.profiling = False
+        self.sample_rate = 10
+        self._profiler = cProfile.Profile()
+        self._profile_lock = threading.RLock()
+        self._counter = 0
+        self._profiled_requests = 0
+
+    def begin(self, address=None):
+        if not self.enabled and not self.profiling:
+            return None
+        trace = RequestTrace(address)
+        self._local.trace = trace
+
+        if self.profiling:
+            self._counter += 1
+            if self._counter % self.sample_rate == 0 and self._profile_lock.acquire(blocking=False):
+                trace.profiled = True
+                self._profiler.enable()
+        return trace
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        trace = getattr(self._local, 'trace', None)
+        if trace:
+            trace.mark(phase)
+
+    def set_path(self, path):
+        if not self.enabled:
+            return
+        trace = getattr(self._local, 'trace', None)
+        if trace:
+            # Keep only the route, query strings carry player ids
+            trace.path = path.split('?', 1)[0]
+
+    def finish(self, trace):
+        if trace is None:
+            return
+        self._local.trace = None
+
+        if trace.profiled:
+            self._profiler.disable()
+            self._profiled_requests += 1
+            self._profile_lock.release()
+
+        if not self.enabled:
+            return
+        trace.total_ms = (time.perf_counter() - trace.start) * 1000
+        self.traces.append(trace)
+
+        if trace.total_ms >= self.slow_threshold_ms:
+            breakdown = ", ".join(f"{k}={v:.2f}ms" for k, v in trace.phases.items())
+            logging.warning(f"Slow request {trace.path} from {trace.address}: {trace.total_ms:.2f}ms ({breakdown})")
+
+    def configure(self, enabled=None, slow_threshold_ms=None):
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = float(slow_threshold_ms)
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def recent(self, limit=50):
+        traces = list(self.traces)[-limit:]
+        return [t.to_dict() for t in traces]
+
+    def start_profiling(self, sample_rate=None, reset=False):
+        with self._profile_lock:
+            if sample_rate:
+                self.sample_rate = max(1, int(sample_rate))
+            if reset:
+                self._profiler = cProfile.Profile()
+                self._profiled_requests = 0
+            self.profiling = True
+
+    def stop_profiling(self):
+        self.profiling = False
+
+    def profile_report(self, limit=30, sort='cumulative'):
+        """Return the aggregated cProfile stats of the sampled requests as text"""
+        with self._profile_lock:
+            if not self._profiled_requests:
+                return "No profiled requests yet."
+            stream = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=stream)
+            stats.sort_stats(sort).print_stats(limit)
+            return f"Profiled requests: {self._profiled_requests}\n" + stream.getvalue()
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "capacity": self.traces.maxlen,
+            "buffered": len(self.traces),
+            "profiling": self.profiling,
+            "sample_rate": self.sample_rate,
+            "profiled_requests": self._profiled_requests
+        }